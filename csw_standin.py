@@ -0,0 +1,512 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Usage: csw_standin.py [-a address] [-p port] [-d sample_directory] [-n synthetic_records] [-l latency_seconds] [-r seconds_per_record] [-b bytes_per_second] [-x error_rate] [-t stall_rate] [-m max_page_size] [-s random_seed] [-z]
+
+Local CSW 2.0.2 stand-in serving HNAP records for harvest benchmarking
+
+Options:
+    -a Address to listen on, default 127.0.0.1
+    -p Port to listen on, default 8000
+    -d Directory of HNAP harvest files to serve the records of, default sample_data
+    -n Serve this many synthetic records cloned from the sample records instead
+    -l Seconds added to every response
+    -r Seconds added per record returned
+    -b Bandwidth cap in bytes per second for each response
+    -x Fraction of requests answered with HTTP 503 (e.g. 0.05)
+    -t Fraction of requests left unanswered for 10 seconds then dropped, past the harvester's timeout
+    -m Most records returned by one GetRecords whatever maxRecords asks for
+    -s Seed for the error injection so runs can be repeated
+    -z  Compress responses with gzip when the client accepts it
+"""
+
+# Point harvest_hnap.py at it with config/harvester.ini
+#
+#   [csw]
+#   url = http://127.0.0.1:8000/csw
+#
+# Serves POSTed GetRecords (hits/results, full/summary, the And/Or,
+# PropertyIsLike on OrganisationName and Subject, BBOX, the _changeDate,
+# Modified and Identifier comparison filters harvest_hnap.py sends, SortBy
+# on them) and
+# GetRecordById over KVP GET.  Each request is logged on stderr with the
+# records and bytes sent.
+
+import BaseHTTPServer
+import SocketServer
+import copy
+import glob
+import os.path
+import random
+import re
+import sys
+import threading
+import time
+import urlparse
+import zlib
+from datetime import datetime, timedelta
+from lxml import etree
+import docopt
+
+CSW_NAMESPACES = {
+    'csw': 'http://www.opengis.net/cat/csw/2.0.2',
+    'ogc': 'http://www.opengis.net/ogc',
+    'gmd': 'http://www.isotc211.org/2005/gmd',
+    'gco': 'http://www.isotc211.org/2005/gco'}
+
+# Property names GeoNetwork filters and sorts the record changeDate on
+CHANGE_DATE_PROPERTIES = ('_changeDate', 'changeDate', 'Modified')
+# and the fileIdentifier and keywords on
+IDENTIFIER_PROPERTIES = ('_uuid', 'Identifier')
+KEYWORD_PROPERTIES = ('Subject', 'keyword')
+# How long a stalled request (-t) hangs before its connection is dropped
+STALL_SECONDS = 10
+
+
+def main():
+    address = arguments['-a'] or '127.0.0.1'
+    port = int(arguments['-p'] or 8000)
+    sample_directory = arguments['-d'] or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'sample_data')
+
+    records = loadRecords(sample_directory)
+    if not records:
+        sys.stderr.write("No records found in %s\n" % sample_directory)
+        return 1
+    if arguments['-n']:
+        records = syntheticRecords(records, int(arguments['-n']))
+
+    catalogue = {
+        'records': records,
+        'by_id': dict((record['id'], record) for record in records),
+        'latency': float(arguments['-l'] or 0),
+        'record_latency': float(arguments['-r'] or 0),
+        'bandwidth': int(arguments['-b'] or 0),
+        'error_rate': float(arguments['-x'] or 0),
+        'stall_rate': float(arguments['-t'] or 0),
+        'max_page_size': int(arguments['-m'] or 0),
+        'gzip': arguments['-z'],
+        'random': random.Random(arguments['-s']),
+        'lock': threading.Lock()
+    }
+
+    server = StandInServer((address, port), StandInHandler)
+    server.catalogue = catalogue
+    sys.stderr.write(
+        "Serving %d records on http://%s:%d/csw\n" % (
+            len(records), address, port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+##################################################
+# Corpus functions
+# loadRecords(sample_directory)
+# syntheticRecords(records, count)
+# recordEntry(record)
+
+
+def loadRecords(sample_directory):
+# Every gmd:MD_Metadata in the directory's XML files, once per
+# fileIdentifier, in file order
+    records = []
+    seen = set()
+    for sample_file in sorted(glob.glob(
+            os.path.join(sample_directory, '*.xml'))):
+        try:
+            root = etree.parse(sample_file).getroot()
+        except etree.XMLSyntaxError:
+            continue
+        for record in root.iter('{%s}MD_Metadata' % CSW_NAMESPACES['gmd']):
+            entry = recordEntry(record)
+            if not entry['id'] or entry['id'] in seen:
+                continue
+            seen.add(entry['id'])
+            records.append(entry)
+    return records
+
+
+def syntheticRecords(records, count):
+# count copies of the sample records with their own fileIdentifier and a
+# changeDate a minute apart from 2000-01-01, so any corpus size can be
+# served with realistic record bodies
+    first_date = datetime(2000, 1, 1)
+    synthetic = []
+    for i in range(count):
+        record = copy.deepcopy(records[i % len(records)]['element'])
+        for identifier in record.xpath(
+                'gmd:fileIdentifier/gco:CharacterString',
+                namespaces=CSW_NAMESPACES):
+            identifier.text = 'standin-%08d' % i
+        for change_date in record.xpath(
+                'gmd:dateStamp/gco:DateTime | gmd:dateStamp/gco:Date',
+                namespaces=CSW_NAMESPACES):
+            if change_date.tag.endswith('}Date'):
+                date_format = '%Y-%m-%d'
+            else:
+                date_format = '%Y-%m-%dT%H:%M:%S'
+            change_date.text = (first_date + timedelta(minutes=i)).strftime(
+                date_format)
+        synthetic.append(recordEntry(record))
+    return synthetic
+
+
+def recordEntry(record):
+# What the filters need from a record, plus its serialized full form
+    file_identifier = record.xpath(
+        'gmd:fileIdentifier/gco:CharacterString/text()',
+        namespaces=CSW_NAMESPACES)
+    change_date = record.xpath(
+        'gmd:dateStamp/gco:DateTime/text() | gmd:dateStamp/gco:Date/text()',
+        namespaces=CSW_NAMESPACES)
+    title = record.xpath(
+        'gmd:identificationInfo/*/gmd:citation/gmd:CI_Citation/gmd:title'
+        '/gco:CharacterString/text()',
+        namespaces=CSW_NAMESPACES)
+    organisations = record.xpath(
+        './/gmd:organisationName/gco:CharacterString/text()',
+        namespaces=CSW_NAMESPACES)
+    keywords = record.xpath(
+        './/gmd:keyword/gco:CharacterString/text()',
+        namespaces=CSW_NAMESPACES)
+    # [west, south, east, north] of every geographic bounding box
+    extents = []
+    for box in record.iter('{%s}EX_GeographicBoundingBox' %
+                           CSW_NAMESPACES['gmd']):
+        try:
+            extents.append([float(box.xpath(
+                'gmd:%s/gco:Decimal/text()' % bound,
+                namespaces=CSW_NAMESPACES)[0]) for bound in (
+                    'westBoundLongitude', 'southBoundLatitude',
+                    'eastBoundLongitude', 'northBoundLatitude')])
+        except (IndexError, ValueError):
+            continue
+    return {
+        'id': file_identifier[0].strip() if file_identifier else None,
+        'change_date': change_date[0].strip() if change_date else '',
+        'title': title[0].strip() if title else '',
+        'organisations': [name.strip() for name in organisations],
+        'keywords': [keyword.strip() for keyword in keywords],
+        'extents': extents,
+        'element': record,
+        'full': etree.tostring(record, encoding='UTF-8')
+    }
+
+
+##################################################
+# Filter functions
+# matchesFilter(record, operation)
+# likePattern(literal, wild_card, single_char, escape_char)
+# envelopeBounds(operation)
+# intersects(extent, bounds)
+# normaliseDate(date_text)
+
+
+def matchesFilter(record, operation):
+# Evaluate an OGC filter operation element against a record entry.
+# Unsupported operations match everything so a stand-in never hides records.
+    name = etree.QName(operation).localname
+    children = [child for child in operation if isinstance(child.tag, str)]
+    if name == 'Filter':
+        return all(matchesFilter(record, child) for child in children)
+    if name == 'And':
+        return all(matchesFilter(record, child) for child in children)
+    if name == 'Or':
+        return any(matchesFilter(record, child) for child in children)
+    if name == 'Not':
+        return not matchesFilter(record, children[0])
+
+    if name == 'BBOX':
+        return any(intersects(extent, envelopeBounds(operation))
+                   for extent in record['extents'])
+
+    property_name = operation.findtext('ogc:PropertyName',
+                                       namespaces=CSW_NAMESPACES)
+    literal = operation.findtext('ogc:Literal', namespaces=CSW_NAMESPACES)
+    if property_name is None or literal is None:
+        return True
+    property_name = property_name.strip()
+
+    if name == 'PropertyIsLike':
+        if property_name == 'OrganisationName':
+            values = record['organisations']
+        elif property_name in KEYWORD_PROPERTIES:
+            values = record['keywords']
+        else:
+            return True
+        pattern = likePattern(
+            literal,
+            operation.get('wildCard', '%'),
+            operation.get('singleChar', '_'),
+            operation.get('escapeChar', '\\'))
+        flags = re.UNICODE
+        if operation.get('matchCase', 'true') == 'false':
+            flags |= re.IGNORECASE
+        matcher = re.compile(pattern, flags)
+        return any(matcher.match(value) for value in values)
+
+    if property_name in CHANGE_DATE_PROPERTIES:
+        value = normaliseDate(record['change_date'])
+        literal = normaliseDate(literal)
+    elif property_name in IDENTIFIER_PROPERTIES:
+        value = record['id']
+        literal = literal.strip()
+    else:
+        return True
+    if name == 'PropertyIsEqualTo':
+        return value == literal
+    if name == 'PropertyIsGreaterThan':
+        return value > literal
+    if name == 'PropertyIsGreaterThanOrEqualTo':
+        return value >= literal
+    if name == 'PropertyIsLessThan':
+        return value < literal
+    if name == 'PropertyIsLessThanOrEqualTo':
+        return value <= literal
+    return True
+
+
+def likePattern(literal, wild_card, single_char, escape_char):
+# PropertyIsLike literal as an anchored regular expression
+    pattern = []
+    escaped = False
+    for character in literal:
+        if escaped:
+            pattern.append(re.escape(character))
+            escaped = False
+        elif character == escape_char:
+            escaped = True
+        elif character == wild_card:
+            pattern.append('.*')
+        elif character == single_char:
+            pattern.append('.')
+        else:
+            pattern.append(re.escape(character))
+    return ''.join(pattern) + '$'
+
+
+def envelopeBounds(operation):
+# [west, south, east, north] of a BBOX filter's gml:Envelope
+    lower = operation.findtext('.//{http://www.opengis.net/gml}lowerCorner')
+    upper = operation.findtext('.//{http://www.opengis.net/gml}upperCorner')
+    return ([float(value) for value in lower.split()] +
+            [float(value) for value in upper.split()])
+
+
+def intersects(extent, bounds):
+# Two [west, south, east, north] boxes overlap
+    return (extent[0] <= bounds[2] and bounds[0] <= extent[2] and
+            extent[1] <= bounds[3] and bounds[1] <= extent[3])
+
+
+def normaliseDate(date_text):
+# Dates and datetimes compared as text, with or without a trailing Z, a
+# date alone being its midnight
+    date_text = date_text.strip().rstrip('Z')[:19]
+    if len(date_text) == 10:
+        date_text += 'T00:00:00'
+    return date_text
+
+
+##################################################
+# Response functions
+# getRecordsResponse(catalogue, request)
+# getRecordByIdResponse(catalogue, identifiers)
+# summaryRecord(record)
+
+
+def getRecordsResponse(catalogue, request):
+# (records returned, GetRecordsResponse body) for a POSTed GetRecords
+    records = catalogue['records']
+    constraint = request.find('.//ogc:Filter', namespaces=CSW_NAMESPACES)
+    if constraint is not None:
+        records = [record for record in records
+                   if matchesFilter(record, constraint)]
+    # Sorted on the last SortProperty first, each sort being stable
+    for sort_property in reversed(request.findall(
+            './/ogc:SortBy/ogc:SortProperty', namespaces=CSW_NAMESPACES)):
+        property_name = (sort_property.findtext(
+            'ogc:PropertyName', namespaces=CSW_NAMESPACES) or '').strip()
+        descending = (sort_property.findtext(
+            'ogc:SortOrder', namespaces=CSW_NAMESPACES) or '').strip() == 'DESC'
+        if property_name in CHANGE_DATE_PROPERTIES:
+            records = sorted(
+                records,
+                key=lambda record: normaliseDate(record['change_date']),
+                reverse=descending)
+        elif property_name in IDENTIFIER_PROPERTIES:
+            records = sorted(
+                records, key=lambda record: record['id'], reverse=descending)
+
+    timestamp = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S')
+    element_set = (request.findtext(
+        './/csw:ElementSetName', namespaces=CSW_NAMESPACES) or 'full').strip()
+    matched = len(records)
+
+    if request.get('resultType') == 'hits':
+        return 0, (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<csw:GetRecordsResponse'
+            ' xmlns:csw="http://www.opengis.net/cat/csw/2.0.2">\n'
+            '  <csw:SearchStatus timestamp="%s" />\n'
+            '  <csw:SearchResults numberOfRecordsMatched="%d"'
+            ' numberOfRecordsReturned="0" elementSet="%s" nextRecord="1" />\n'
+            '</csw:GetRecordsResponse>\n') % (timestamp, matched, element_set)
+
+    max_records = int(request.get('maxRecords', 10))
+    if catalogue['max_page_size']:
+        max_records = min(max_records, catalogue['max_page_size'])
+    start_position = max(1, int(request.get('startPosition', 1)))
+    page = records[start_position - 1:start_position - 1 + max_records]
+    next_record = start_position + len(page)
+    if next_record > matched:
+        next_record = 0
+
+    if element_set == 'full':
+        body = ''.join(record['full'] for record in page)
+    else:
+        body = ''.join(summaryRecord(record) for record in page)
+
+    return len(page), (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<csw:GetRecordsResponse'
+        ' xmlns:csw="http://www.opengis.net/cat/csw/2.0.2">\n'
+        '  <csw:SearchStatus timestamp="%s" />\n'
+        '  <csw:SearchResults numberOfRecordsMatched="%d"'
+        ' numberOfRecordsReturned="%d" elementSet="%s" nextRecord="%d">\n'
+        '%s\n'
+        '  </csw:SearchResults>\n'
+        '</csw:GetRecordsResponse>\n') % (
+            timestamp, matched, len(page), element_set, next_record, body)
+
+
+def getRecordByIdResponse(catalogue, identifiers):
+# (records returned, GetRecordByIdResponse body), unknown ids are left out
+    page = [catalogue['by_id'][identifier] for identifier in identifiers
+            if identifier in catalogue['by_id']]
+    return len(page), (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<csw:GetRecordByIdResponse'
+        ' xmlns:csw="http://www.opengis.net/cat/csw/2.0.2">\n'
+        '%s\n'
+        '</csw:GetRecordByIdResponse>\n') % ''.join(
+            record['full'] for record in page)
+
+
+def summaryRecord(record):
+# Dublin Core summary of a record, what --two-phase lists
+    element = etree.Element(
+        '{%s}SummaryRecord' % CSW_NAMESPACES['csw'],
+        nsmap={'csw': CSW_NAMESPACES['csw'],
+               'dc': 'http://purl.org/dc/elements/1.1/',
+               'dct': 'http://purl.org/dc/terms/'})
+    etree.SubElement(
+        element, '{http://purl.org/dc/elements/1.1/}identifier').text = \
+        record['id']
+    etree.SubElement(
+        element, '{http://purl.org/dc/elements/1.1/}title').text = \
+        record['title']
+    etree.SubElement(
+        element, '{http://purl.org/dc/terms/}modified').text = \
+        record['change_date']
+    return etree.tostring(element, encoding='UTF-8')
+
+
+##################################################
+# Server classes
+# StandInServer
+# StandInHandler
+
+
+class StandInServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+# One thread per connection so concurrent page workers overlap
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class StandInHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+# Keep-alive HTTP/1.1 like the real CSW, with the injected latency, errors
+# and bandwidth cap applied to every request
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        request_xml = self.rfile.read(
+            int(self.headers.getheader('Content-Length', 0)))
+        catalogue = self.server.catalogue
+        try:
+            request = etree.XML(request_xml)
+        except etree.XMLSyntaxError:
+            self.reply(400, 'Malformed GetRecords request\n', 0, 'POST')
+            return
+        returned, body = getRecordsResponse(catalogue, request)
+        self.reply(200, body, returned, 'GetRecords start=%s max=%s' % (
+            request.get('startPosition'), request.get('maxRecords')))
+
+    def do_GET(self):
+        parameters = dict(
+            (key.lower(), value[0]) for key, value in
+            urlparse.parse_qs(urlparse.urlparse(self.path).query).items())
+        if parameters.get('request') != 'GetRecordById':
+            self.reply(400, 'Only GetRecordById is served over GET\n', 0,
+                       'GET')
+            return
+        identifiers = [identifier for identifier in
+                       parameters.get('id', '').split(',') if identifier]
+        returned, body = getRecordByIdResponse(
+            self.server.catalogue, identifiers)
+        self.reply(200, body, returned,
+                   'GetRecordById ids=%d' % len(identifiers))
+
+    def reply(self, status, body, returned, description):
+        catalogue = self.server.catalogue
+        started = time.time()
+        with catalogue['lock']:
+            failed = catalogue['random'].random() < catalogue['error_rate']
+            stalled = (catalogue['stall_rate'] and
+                       catalogue['random'].random() < catalogue['stall_rate'])
+        if stalled:
+            time.sleep(STALL_SECONDS)
+            self.close_connection = 1
+            sys.stderr.write("%s stalled %.3fs\n" % (
+                description, time.time() - started))
+            return
+        if failed:
+            status, body, returned = 503, 'Injected failure\n', 0
+
+        time.sleep(catalogue['latency'] +
+                   catalogue['record_latency'] * returned)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/xml; charset=UTF-8')
+        decoded_size = len(body)
+        if catalogue['gzip'] and 'gzip' in self.headers.getheader(
+                'Accept-Encoding', ''):
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            body = compressor.compress(body) + compressor.flush()
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if catalogue['bandwidth']:
+            # Trickle the body out in tenths of a second's worth
+            chunk_size = max(1, catalogue['bandwidth'] // 10)
+            for offset in range(0, len(body), chunk_size):
+                self.wfile.write(body[offset:offset + chunk_size])
+                self.wfile.flush()
+                time.sleep(0.1)
+        else:
+            self.wfile.write(body)
+
+        sys.stderr.write(
+            "%s %d records=%d bytes=%d sent=%d %.3fs\n" % (
+                description, status, returned, decoded_size, len(body),
+                time.time() - started))
+
+
+if __name__ == "__main__":
+    arguments = docopt.docopt(__doc__)
+    sys.exit(main())
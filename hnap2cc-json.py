@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-"""Usage: hnap2cc-json.py [-f xml_file_input] [-e Error file to generate] [-o Output environment]
+"""Usage: hnap2cc-json.py [-f xml_file_input] [-d xml_directory] [-g file_patterns] [-j jobs] [-e Error file to generate] [-o Output environment] [--ignore-index]
 
 Convert HNAP 2.3.1 XML from FGP platform CSW v1.6.2 to OGP Portal input
 
@@ -8,17 +8,29 @@ Accepts streamed HNAP xml input or a supplied HNAP xml filename
 
     cat hnap.xml | hnap2cc-json.py [-e Error file to generate]
     hnap2cc-json.py [-e Error file to generate] hnap.xml
+    hnap2cc-json.py [-g file_patterns] -d xml_directory
 
 Options:
     -e Error file to generate
     -f xml_file_input
+    -d xml_directory
+    -g file_patterns  Comma separated file name patterns [default: *xml]
+    -j jobs  Processes mapping the records side by side [default: 1]
     -o output environment
+    --ignore-index  Convert records already uploaded at the same changeDate
 """
+import collections
 import errno
+import functools
+import itertools
+import mmap
+import multiprocessing
+import operator
 import os
 import shutil
 from ResourceType import ResourceType
 from CL_Formats import CL_Formats
+from record_index import recordIndexFile, loadRecordIndex, savePendingRecords, recordChangeDate, isUnchanged
 
 import csv
 from lxml import etree
@@ -51,6 +63,8 @@ MAX_TAG_LENGTH = 140
 # TL err/dbg
 error_output = []
 error_records = {}
+# Files of -d that weren't well formed, rejected as a whole
+unreadable_files = []
 
 ##################################################
 # Process the command request
@@ -59,13 +73,25 @@ error_records = {}
 # input_file     = 'data/majechr_source.xml'
 # input_file     = 'data/hnap_import.xml'
 input_file = None
-records_root = None
+# Records are the gmd:MD_Metadata elements directly under one of these
+# (None being the document root), see readDocuments()
+record_parents = None
+# Directory of single record files and the file name patterns to convert
+input_directory = None
+input_patterns = None
 SingleXmlInput = None
 
 parser = argparse.ArgumentParser(description='Process provided XML metadata')
 parser.add_argument('-e', type=str, help='error file to generate')
 parser.add_argument('-f', type=str, help='XML file input')
+parser.add_argument('-d', type=str, help='Directory of XML files input')
+parser.add_argument('-g', type=str, default='*xml',
+                    help='Comma separated file name patterns for the directory')
+parser.add_argument('-j', type=int, default=1,
+                    help='Processes mapping the records side by side')
 parser.add_argument('-o', type=str, help='Output environment')
+parser.add_argument('--ignore-index', action='store_true',
+                    help='Convert records already uploaded at the same changeDate')
 args = parser.parse_args()
 OutputEnv = args.o.upper()
 if 'PROD' in OutputEnv:
@@ -85,14 +111,24 @@ def ProcDirCreation():
         if e.errno != errno.EEXIST:
             raise  # This was not a "directory exist" error..
 
+# Map a file read-only so converters reading the same file share the page
+# cache rather than each holding a copy.  An empty file can't be mapped.
+def mapInput(file_name):
+    with open(file_name, 'rb') as fh:
+        if not os.fstat(fh.fileno()).st_size:
+            return BytesIO()
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
 
-# Use stdin if it's populated
-if not sys.stdin.isatty():
-    input_file = BytesIO(sys.stdin.read())
 
-    records_root = ("/csw:GetRecordsResponse/"
-                      "csw:SearchResults/"
-                      "gmd:MD_Metadata")
+# Responses of the CSW, as harvest_hnap.py prints them
+RESPONSE_RECORD_PARENTS = (
+    '{http://www.opengis.net/cat/csw/2.0.2}SearchResults',
+    '{http://www.opengis.net/cat/csw/2.0.2}GetRecordByIdResponse')
+
+# Use stdin if it's populated, read as the records are converted
+if not sys.stdin.isatty():
+    input_file = sys.stdin
+    record_parents = RESPONSE_RECORD_PARENTS
     # a_string = "A string is more than its more parts!"
     # matches = ["more", "wholesome", "milk"]
     # mat = [x for x in matches if x in a_string]
@@ -102,21 +138,22 @@ if not sys.stdin.isatty():
 
 # Otherwise, read for a given filename
 if not args.f == None:
-    input_file = args.f
-    with open(args.f, 'rb') as fh:
-        input_file = BytesIO(fh.read())
+    input_file = mapInput(args.f)
     # input_file = open(args.f, 'rb').read().splitlines()
-    records_root = ("/gmd:MD_Metadata")
+    record_parents = (None,)
     SingleXmlInput = True
-else:
-    with open("harvested_records.xml", 'rb') as fh:
-        input_file = BytesIO(fh.read())
+elif not args.d == None:
+    # Every matching file in turn, as with -f, see readDirectory()
+    input_directory = args.d
+    input_patterns = args.g.split(',')
+    SingleXmlInput = True
+elif input_file is None:
+    # Nothing piped in, convert the last harvest
+    input_file = mapInput("harvested_records.xml")
     # input_file = open("harvested_records.xml", 'rb').read().splitlines()
-    records_root = ("/csw:GetRecordsResponse/"
-                      "csw:SearchResults/"
-                      "gmd:MD_Metadata")
+    record_parents = RESPONSE_RECORD_PARENTS
 
-if input_file is None:
+if input_file is None and input_directory is None:
     sys.stdout.write("""
 Either stream HNAP in or supply a file
 > cat hnap.xml | ./hnap2json.py
@@ -135,19 +172,9 @@ Either stream HNAP in or supply a file
 # subsequent records.  You can't re-process data
 # from a particular span of time, any historical
 # re-procssing must continue to the current day.
-input_data_blocks = []
-active_input_block = ''
-for line in input_file:
-    if not line.strip():
-        continue
-    if active_input_block == '':
-        active_input_block += line
-    elif re.search(r'^<\?xml', line):
-        input_data_blocks.append(active_input_block)
-        active_input_block = line
-    else:
-        active_input_block += line
-input_data_blocks.append(active_input_block)
+#
+# The blocks are read and parsed one at a time as they are converted, see
+# readDocuments(), so the input is never held in memory as a whole.
 
 ##################################################
 # Extract the schema to convert to
@@ -218,6 +245,16 @@ def main():
     output_err = "harvested_record_errors.csv"
     num_rejects = 0
     num_view_on_map = 0
+    num_unchanged = 0
+
+    # Records already uploaded to the -o environment at the same changeDate
+    # are skipped before mapping.  The accepted records are only pending
+    # for the index until startharvest.sh has uploaded them.
+    index_file = recordIndexFile(arguments['-o'])
+    record_index = None
+    if not arguments['--ignore-index']:
+        record_index = loadRecordIndex(index_file)
+    converted_records = {}
 
     OrgNameDict = {
         "Government of Canada",
@@ -383,1617 +420,1643 @@ def main():
     if arguments['-e']:
         output_err = arguments['-e']
 
-    json_records = []
-    for input_block in input_data_blocks:
-        if not input_block:
-            continue
-
-        # Read the file, should be a streamed input in the future
-        ##DEBUG START##
-        # root = etree.parse("harvested_records.xml")
-        ##DEBUG END##
-        root = etree.XML(input_block)
-        # Parse the root and iterate over each record
-        records = fetchXMLArray(root, records_root)
-
-###############################################
-###############################################
-        for record in records:
-            json_record = {}
-            can_be_used_in_RAMP = False
-            json_record['display_flags'] = []
+    if input_directory is not None:
+        input_documents = readDirectory(input_directory, input_patterns)
+    else:
+        input_documents = readDocuments(input_file, record_parents)
+
+    # Map one record to its Common Core JSON record, reporting its errors
+    # with reportError().  Returns (HNAP_fileIdentifier, json_record,
+    # can_be_used_in_RAMP), False when the rest of the input block is
+    # skipped and None when the conversion can't go on.  The records can be
+    # mapped in worker processes, see mappedRecords()
+    def mapRecord(record):
+        json_record = {}
+        can_be_used_in_RAMP = False
+        json_record['display_flags'] = []
+        schema_ref = loadSchemaConfig(schema_file_en)
+        ##################################################
+        # HNAP CORE LANGUAGE
+        ##################################################
+        # Language is required, the rest can't be processed
+        # for errors if the primary language is not certain
+        ReadOrgName = None
+        strfileIdentifier = fetchXMLValues(record, schema_ref["05"]['FGP XPATH'])
+
+        if sanitySingle('NOID', ['fileIdentifier'], strfileIdentifier) is False:
+                HNAP_fileIdentifier = False
+        else:
+            HNAP_fileIdentifier = sanityFirst(strfileIdentifier)
+        if HNAP_fileIdentifier:
+            ReadOrgName = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["16a"])
+            if len(ReadOrgName) > 0:
+                ReadOrgName = ReadOrgName[0]
+            else:
+                print 'no valid orgnamefound for ' + HNAP_fileIdentifier
+                return None
+        else:
+            print 'no valid  file identifier found : ' + HNAP_fileIdentifier
+            return None
+        
+        fetch_nunicipalname = [x for x in MunicipalDict if unicode(x.lower(), 'UTF-8') in ReadOrgName.lower()]
+        
+        ReadOrgName = ReadOrgName.split(';')[0]
+        QcgovData1 = unicode('québec'.lower(), 'utf-8')
+        QcgovData2 = unicode('quebec'.lower(), 'utf-8')
+        CangovData = unicode('Canada'.lower(), 'utf-8')
+        OngovData = unicode('Ontario'.lower(), 'utf-8')
+
+        if QcgovData1 in ReadOrgName.lower():
+            schema_ref = {}
+            schema_ref = loadSchemaConfig(schema_file_fr)
+        elif QcgovData2 in ReadOrgName.lower():
+            schema_ref = {}
+            schema_ref = loadSchemaConfig(schema_file_fr)
+        elif CangovData in ReadOrgName.lower():
+            schema_ref = {}
+            schema_ref = loadSchemaConfig(schema_file_ca_en)
+        elif OngovData in ReadOrgName.lower():
+            schema_ref = {}
+            schema_ref = loadSchemaConfig(schema_file_on)
+        else:
+            schema_ref = {}
             schema_ref = loadSchemaConfig(schema_file_en)
-            ##################################################
-            # HNAP CORE LANGUAGE
-            ##################################################
-            # Language is required, the rest can't be processed
-            # for errors if the primary language is not certain
-            ReadOrgName = None
-            strfileIdentifier = fetchXMLValues(record, schema_ref["05"]['FGP XPATH'])
 
-            if sanitySingle('NOID', ['fileIdentifier'], strfileIdentifier) is False:
-                    HNAP_fileIdentifier = False
-            else:
-                HNAP_fileIdentifier = sanityFirst(strfileIdentifier)
-            if HNAP_fileIdentifier:
-                ReadOrgName = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["16a"])
-                if len(ReadOrgName) > 0:
-                    ReadOrgName = ReadOrgName[0]
-                else:
-                    print 'no valid orgnamefound for ' + HNAP_fileIdentifier
-                    return 0
+        tmp = fetchXMLValues(record, schema_ref["12"]['FGP XPATH'])
+        if sanitySingle('NOID', ['HNAP Priamry Language'], tmp) is False:
+            HNAP_primary_language = False
+        else:
+            HNAP_primary_language = sanityFirst(tmp).split(';')[0].strip()
+            if HNAP_primary_language == 'eng':
+                CKAN_primary_lang = 'en'
+                CKAN_secondary_lang = 'fr'
+                HNAP_primary_lang = 'English'
+                HNAP_secondary_lang = 'French'
             else:
-                print 'no valid  file identifier found : ' + HNAP_fileIdentifier
-                return 0
-            
-            fetch_nunicipalname = [x for x in MunicipalDict if unicode(x.lower(), 'UTF-8') in ReadOrgName.lower()]
-            
-            ReadOrgName = ReadOrgName.split(';')[0]
-            QcgovData1 = unicode('québec'.lower(), 'utf-8')
-            QcgovData2 = unicode('quebec'.lower(), 'utf-8')
-            CangovData = unicode('Canada'.lower(), 'utf-8')
-            OngovData = unicode('Ontario'.lower(), 'utf-8')
-
-            if QcgovData1 in ReadOrgName.lower():
                 schema_ref = {}
-                schema_ref = loadSchemaConfig(schema_file_fr)
-            elif QcgovData2 in ReadOrgName.lower():
-                schema_ref = {}
-                schema_ref = loadSchemaConfig(schema_file_fr)
-            elif CangovData in ReadOrgName.lower():
-                schema_ref = {}
-                schema_ref = loadSchemaConfig(schema_file_ca_en)
-            elif OngovData in ReadOrgName.lower():
-                schema_ref = {}
-                schema_ref = loadSchemaConfig(schema_file_on)
+                schema_ref = loadSchemaConfig(schema_file_ca_fr)
+                CKAN_secondary_lang = 'fr'
+                CKAN_primary_lang = 'en'
+                HNAP_secondary_lang = 'French'
+                HNAP_primary_lang = 'English'
+                HNAP_primary_language = 'eng'
+
+        ##################################################
+        # Catalogue Metadata
+        ##################################################
+
+        # CC::OpenMaps-01 Catalogue Type
+        json_record[schema_ref["01"]['CKAN API property']] = 'dataset'
+        # CC::OpenMaps-02 Collection Type
+        json_record[schema_ref["02"]['CKAN API property']] = 'fgp'
+        # CC::OpenMaps-03 Metadata Scheme
+        #       CKAN defined/provided
+        # CC::OpenMaps-04 Metadata Scheme Version
+        #       CKAN defined/provided
+        # CC::OpenMaps-05 Metadata Record Identifier
+        tmp = fetchXMLValues(record, schema_ref["05"]['FGP XPATH'])
+        if str(tmp) == "[\'5c252e65-1446-425c-84c3-753ebfdc8b77\']":
+            if sanitySingle('NOID', ['fileIdentifier'], tmp) is False:
+                HNAP_fileIdentifier = False
             else:
-                schema_ref = {}
-                schema_ref = loadSchemaConfig(schema_file_en)
-
-            tmp = fetchXMLValues(record, schema_ref["12"]['FGP XPATH'])
-            if sanitySingle('NOID', ['HNAP Priamry Language'], tmp) is False:
-                HNAP_primary_language = False
+                json_record[schema_ref["05"]['CKAN API property']] = \
+                    HNAP_fileIdentifier = \
+                    sanityFirst(tmp)
+        else:
+            if sanitySingle('NOID', ['fileIdentifier'], tmp) is False:
+                HNAP_fileIdentifier = False
             else:
-                HNAP_primary_language = sanityFirst(tmp).split(';')[0].strip()
-                if HNAP_primary_language == 'eng':
-                    CKAN_primary_lang = 'en'
-                    CKAN_secondary_lang = 'fr'
-                    HNAP_primary_lang = 'English'
-                    HNAP_secondary_lang = 'French'
-                else:
-                    schema_ref = {}
-                    schema_ref = loadSchemaConfig(schema_file_ca_fr)
-                    CKAN_secondary_lang = 'fr'
-                    CKAN_primary_lang = 'en'
-                    HNAP_secondary_lang = 'French'
-                    HNAP_primary_lang = 'English'
-                    HNAP_primary_language = 'eng'
+                json_record[schema_ref["05"]['CKAN API property']] = \
+                    HNAP_fileIdentifier = \
+                    sanityFirst(tmp)
 
-            ##################################################
-            # Catalogue Metadata
-            ##################################################
+        ##################################################
+        # Point of no return
+        # fail out if you don't have either a primary language or ID
+        ##################################################
 
-            # CC::OpenMaps-01 Catalogue Type
-            json_record[schema_ref["01"]['CKAN API property']] = 'dataset'
-            # CC::OpenMaps-02 Collection Type
-            json_record[schema_ref["02"]['CKAN API property']] = 'fgp'
-            # CC::OpenMaps-03 Metadata Scheme
-            #       CKAN defined/provided
-            # CC::OpenMaps-04 Metadata Scheme Version
-            #       CKAN defined/provided
-            # CC::OpenMaps-05 Metadata Record Identifier
-            tmp = fetchXMLValues(record, schema_ref["05"]['FGP XPATH'])
-            if str(tmp) == "[\'5c252e65-1446-425c-84c3-753ebfdc8b77\']":
-                if sanitySingle('NOID', ['fileIdentifier'], tmp) is False:
-                    HNAP_fileIdentifier = False
-                else:
-                    json_record[schema_ref["05"]['CKAN API property']] = \
-                        HNAP_fileIdentifier = \
-                        sanityFirst(tmp)
-            else:
-                if sanitySingle('NOID', ['fileIdentifier'], tmp) is False:
-                    HNAP_fileIdentifier = False
-                else:
-                    json_record[schema_ref["05"]['CKAN API property']] = \
-                        HNAP_fileIdentifier = \
-                        sanityFirst(tmp)
-
-            ##################################################
-            # Point of no return
-            # fail out if you don't have either a primary language or ID
-            ##################################################
+        if HNAP_primary_language is False or HNAP_fileIdentifier is False:
+            return False
 
-            if HNAP_primary_language is False or HNAP_fileIdentifier is False:
-                break
+        # From here on in continue if you can and collect as many errors as
+        # possible for FGP Help desk.  We awant to have a full report of issues
+        # to correct, not piecemeal errors.
+        # It's faster for them to correct a batch of errors in parallel as
+        # opposed to doing them piecemeal.
+
+        # CC::OpenMaps-06 Metadata Contact (English)
+        primary_vals = []
+        # organizationName
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["06a"])
+        if value:
+            for single_value in value:
+                primary_vals.append(single_value)
+        # voice
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["06b"])
+        if value:
+            for single_value in value:
+                primary_vals.append(single_value)
+        # electronicMailAddress
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["06c"])
+        if value:
+            for single_value in value:
+                primary_vals.append(single_value)
+
+        json_record[schema_ref["06"]['CKAN API property']] = {}
+        json_record[
+            schema_ref["06"]['CKAN API property']
+        ][CKAN_primary_lang] = ','.join(primary_vals)
+
+        # CC::OpenMaps-07 Metadata Contact (French)
+        second_vals = []
+
+        # organizationName
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["07a"])
+        if value:
+            for single_value in value:
+                second_vals.append(single_value)
+        # voice
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["07b"])
+        if value:
+            for single_value in value:
+                primary_vals.append(single_value)
+        # electronicMailAddress
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["07c"])
+        if value:
+            for single_value in value:
+                second_vals.append(single_value)
+
+        json_record[
+            schema_ref["06"]['CKAN API property']
+        ][CKAN_secondary_lang] = ','.join(second_vals)
+
+        # CC::OpenMaps-08 Source Metadata Record Date Stamp
+        tmp = fetchXMLValues(record, schema_ref["08a"]['FGP XPATH'])
+        values = list(set(tmp))
+        if len(values) < 1:
+            tmp = fetchXMLValues(record, schema_ref["08b"]['FGP XPATH'])
+
+        if sanityMandatory(
+                HNAP_fileIdentifier,
+                [schema_ref["08"]['CKAN API property']],
+                tmp
+        ):
+            if sanitySingle(
+                    HNAP_fileIdentifier,
+                    [schema_ref["08"]['CKAN API property']],
+                    tmp
+            ):
+                # Might be a iso datetime
+                date_str = sanityFirst(tmp)
+                if date_str.count('T') == 1:
+                    date_str = date_str.split('T')[0]
 
-            # From here on in continue if you can and collect as many errors as
-            # possible for FGP Help desk.  We awant to have a full report of issues
-            # to correct, not piecemeal errors.
-            # It's faster for them to correct a batch of errors in parallel as
-            # opposed to doing them piecemeal.
+                if sanityDate(
+                        HNAP_fileIdentifier,
+                        [schema_ref["08"]['CKAN API property']],
+                        date_str):
+                    json_record[schema_ref["08"]['CKAN API property']] = \
+                        date_str
 
-            # CC::OpenMaps-06 Metadata Contact (English)
-            primary_vals = []
-            # organizationName
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["06a"])
-            if value:
-                for single_value in value:
-                    primary_vals.append(single_value)
-            # voice
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["06b"])
-            if value:
-                for single_value in value:
-                    primary_vals.append(single_value)
-            # electronicMailAddress
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["06c"])
-            if value:
-                for single_value in value:
-                    primary_vals.append(single_value)
+        # CC::OpenMaps-09 Metadata Contact (French)
 
-            json_record[schema_ref["06"]['CKAN API property']] = {}
-            json_record[
-                schema_ref["06"]['CKAN API property']
-            ][CKAN_primary_lang] = ','.join(primary_vals)
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["09"])
+        if value:
+            json_record[schema_ref["09"]['CKAN API property']] = value
 
-            # CC::OpenMaps-07 Metadata Contact (French)
-            second_vals = []
+        # CC::OpenMaps-10 Parent identifier
 
-            # organizationName
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["07a"])
-            if value:
-                for single_value in value:
-                    second_vals.append(single_value)
-            # voice
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["07b"])
-            if value:
-                for single_value in value:
-                    primary_vals.append(single_value)
-            # electronicMailAddress
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["07c"])
-            if value:
-                for single_value in value:
-                    second_vals.append(single_value)
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["10"])
+        if value:
+            json_record[schema_ref["10"]['CKAN API property']] = value
 
-            json_record[
-                schema_ref["06"]['CKAN API property']
-            ][CKAN_secondary_lang] = ','.join(second_vals)
+        # CC::OpenMaps-11 Hierarchy level
 
-            # CC::OpenMaps-08 Source Metadata Record Date Stamp
-            tmp = fetchXMLValues(record, schema_ref["08a"]['FGP XPATH'])
-            values = list(set(tmp))
-            if len(values) < 1:
-                tmp = fetchXMLValues(record, schema_ref["08b"]['FGP XPATH'])
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["11"])
+        if value:
+            json_record[schema_ref["11"]['CKAN API property']] = value
 
-            if sanityMandatory(
-                    HNAP_fileIdentifier,
-                    [schema_ref["08"]['CKAN API property']],
-                    tmp
-            ):
-                if sanitySingle(
-                        HNAP_fileIdentifier,
-                        [schema_ref["08"]['CKAN API property']],
-                        tmp
-                ):
-                    # Might be a iso datetime
-                    date_str = sanityFirst(tmp)
-                    if date_str.count('T') == 1:
-                        date_str = date_str.split('T')[0]
-
-                    if sanityDate(
-                            HNAP_fileIdentifier,
-                            [schema_ref["08"]['CKAN API property']],
-                            date_str):
-                        json_record[schema_ref["08"]['CKAN API property']] = \
-                            date_str
-
-            # CC::OpenMaps-09 Metadata Contact (French)
-
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["09"])
-            if value:
-                json_record[schema_ref["09"]['CKAN API property']] = value
+        # CC::OpenMaps-12 File Identifier
 
-            # CC::OpenMaps-10 Parent identifier
+        json_record[schema_ref["12"]['CKAN API property']] = \
+            HNAP_fileIdentifier
 
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["10"])
-            if value:
-                json_record[schema_ref["10"]['CKAN API property']] = value
+        # CC::OpenMaps-13 Short Key
 
-            # CC::OpenMaps-11 Hierarchy level
+        # Disabled as per the current install of RAMP
+        # json_record[schema_ref["13"]
+        # ['CKAN API property']] = HNAP_fileIdentifier[0:8]
 
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["11"])
-            if value:
-                json_record[schema_ref["11"]['CKAN API property']] = value
+        # CC::OpenMaps-14 Title (English)
+        json_record[schema_ref["14"]['CKAN API property']] = {}
 
-            # CC::OpenMaps-12 File Identifier
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["14a"])
+        if value:
+            json_record[
+                schema_ref["14"]['CKAN API property']
+            ][schema_ref["14a"]['CKAN API property'].split('.')[1]] = value
+        # CC::OpenMaps-15 Title (French)
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["14b"])
 
-            json_record[schema_ref["12"]['CKAN API property']] = \
-                HNAP_fileIdentifier
+        # CKAN_secondary_lang = langtrans  ##2lang trans
 
-            # CC::OpenMaps-13 Short Key
+        if value:
+            json_record[
+                schema_ref["14"]['CKAN API property']
+            ][schema_ref["14b"]['CKAN API property'].split('.')[1]] = value
+
+        # CC::OpenMaps-16 Publisher - Current Organization Name
+
+        org_strings = []
+        org_string = ''
+        abstring = ''
+        bcstring = ''
+        attempt = ''
+
+        value = fetch_FGP_value(
+            record, HNAP_fileIdentifier, schema_ref["16a"])
+        value[0] = value[0].split(',')[0]
+        if not 'government of canada' in value[0].lower():
+            value[0] = value[0].split(';')[0]
+
+        if isinstance(value[0], unicode):
+            value[0] = value[0]
+
+
+        fetch_orgname = [x for x in OrgNameDict if unicode(x.lower(),'UTF-8') in value[0].lower()]
+
+        orgname = ""
+        org_name = ""
+        Primary_org_list = []
+        secondary_lang_search_string = ""
+        if len(fetch_orgname)>0:
+            orgname = fetch_orgname[0]
+            if HNAP_primary_lang == 'English':
+                primary_lang_search_string = ""+ orgname+";" # Government of Canada;"
+                secondary_lang_search_string = "" + OrgNameDictSecondLang[orgname]+";" #Gouvernement du Canada;"
+                Primary_org_list = GC_Registry_of_Organization_en
+                secondary_org_list = GC_Registry_of_Organization_fr
+            else:
+                Primary_org_list = GC_Registry_of_Organization_fr
+                secondary_org_list = GC_Registry_of_Organization_en
+                primary_lang_search_string =  "" + orgname +";" #Gouvernement du Canada;"
+                secondary_lang_search_string = ""+ OrgNameDictSecondLang[orgname] +";" # Government of Canada;"
 
-            # Disabled as per the current install of RAMP
-            # json_record[schema_ref["13"]
-            # ['CKAN API property']] = HNAP_fileIdentifier[0:8]
 
-            # CC::OpenMaps-14 Title (English)
-            json_record[schema_ref["14"]['CKAN API property']] = {}
 
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["14a"])
-            if value:
-                json_record[
-                    schema_ref["14"]['CKAN API property']
-                ][schema_ref["14a"]['CKAN API property'].split('.')[1]] = value
-            # CC::OpenMaps-15 Title (French)
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["14b"])
 
-            # CKAN_secondary_lang = langtrans  ##2lang trans
+        # value = fetch_FGP_value(
+        #     record, HNAP_fileIdentifier, schema_ref["16a"])
+        # value[0] = value[0].split(',')[0]
+        if not value or len(value) < 1:
+            attempt += "No primary language value"
+        else:
+            attempt += "Has primary language value [" + str(len(value)) + "]"
+            for single_value in value:
+                orgnamefound = False
+                for org_name in Primary_org_list:
+                    try:
+                        if re.search(unicode(org_name, "UTF-8"), single_value):
+                            org_strings.append(single_value)
+                            orgnamefound = True
+                            break
+                        elif single_value in unicode(org_name, "UTF-8"):
+                            org_strings.append(single_value)
+                            orgnamefound = True
+                            break
+                    except:
+                        print("An exception occurred")
 
-            if value:
-                json_record[
-                    schema_ref["14"]['CKAN API property']
-                ][schema_ref["14b"]['CKAN API property'].split('.')[1]] = value
-
-            # CC::OpenMaps-16 Publisher - Current Organization Name
-
-            org_strings = []
-            org_string = ''
-            abstring = ''
-            bcstring = ''
-            attempt = ''
-
-            value = fetch_FGP_value(
-                record, HNAP_fileIdentifier, schema_ref["16a"])
-            value[0] = value[0].split(',')[0]
-            if not 'government of canada' in value[0].lower():
-                value[0] = value[0].split(';')[0]
-
-            if isinstance(value[0], unicode):
-                value[0] = value[0]
-
-
-            fetch_orgname = [x for x in OrgNameDict if unicode(x.lower(),'UTF-8') in value[0].lower()]
-
-            orgname = ""
-            org_name = ""
-            Primary_org_list = []
-            secondary_lang_search_string = ""
-            if len(fetch_orgname)>0:
-                orgname = fetch_orgname[0]
-                if HNAP_primary_lang == 'English':
-                    primary_lang_search_string = ""+ orgname+";" # Government of Canada;"
-                    secondary_lang_search_string = "" + OrgNameDictSecondLang[orgname]+";" #Gouvernement du Canada;"
-                    Primary_org_list = GC_Registry_of_Organization_en
-                    secondary_org_list = GC_Registry_of_Organization_fr
-                else:
-                    Primary_org_list = GC_Registry_of_Organization_fr
-                    secondary_org_list = GC_Registry_of_Organization_en
-                    primary_lang_search_string =  "" + orgname +";" #Gouvernement du Canada;"
-                    secondary_lang_search_string = ""+ OrgNameDictSecondLang[orgname] +";" # Government of Canada;"
 
+                if not orgnamefound:
+                    attempt += " but no GoC/GdC prefix [" + single_value + "]"
 
+        value = fetch_FGP_value(
+            record, HNAP_fileIdentifier, schema_ref["16b"])
+        value[0] = value[0].split(',')[0]
+        if not value or len(value) < 1:
+            attempt += ", no secondary language value"
+        else:
+            attempt += ", secondary language [" + str(len(value)) + "]"
+            for single_value in value:
+                if re.search(secondary_lang_search_string.lower(), single_value.lower().encode("UTF-8")):
+                    org_strings.append(single_value.encode("UTF-8"))
+                else:
+                    attempt += " but no GoC/GdC [" + single_value + "]"
 
+        org_strings = list(set(org_strings))
 
-            # value = fetch_FGP_value(
-            #     record, HNAP_fileIdentifier, schema_ref["16a"])
-            # value[0] = value[0].split(',')[0]
-            if not value or len(value) < 1:
-                attempt += "No primary language value"
-            else:
-                attempt += "Has primary language value [" + str(len(value)) + "]"
-                for single_value in value:
-                    orgnamefound = False
-                    for org_name in Primary_org_list:
-                        try:
-                            if re.search(unicode(org_name, "UTF-8"), single_value):
-                                org_strings.append(single_value)
-                                orgnamefound = True
-                                break
-                            elif single_value in unicode(org_name, "UTF-8"):
-                                org_strings.append(single_value)
-                                orgnamefound = True
-                                break
-                        except:
-                            print("An exception occurred")
-
-
-                    if not orgnamefound:
-                        attempt += " but no GoC/GdC prefix [" + single_value + "]"
-
-            value = fetch_FGP_value(
-                record, HNAP_fileIdentifier, schema_ref["16b"])
-            value[0] = value[0].split(',')[0]
-            if not value or len(value) < 1:
-                attempt += ", no secondary language value"
-            else:
-                attempt += ", secondary language [" + str(len(value)) + "]"
-                for single_value in value:
-                    if re.search(secondary_lang_search_string.lower(), single_value.lower().encode("UTF-8")):
-                        org_strings.append(single_value.encode("UTF-8"))
-                    else:
-                        attempt += " but no GoC/GdC [" + single_value + "]"
+        if len(org_strings) < 1:
+            reportError(
+                HNAP_fileIdentifier, [
+                    schema_ref["16"]['CKAN API property'],
+                    "Bad organizationName, no Government of Canada",
+                    attempt
+                ])
+        else:
+            valid_orgs = []
+            curorgname = []
+
+            for org_string in org_strings:
+                provdata = False
+                GOC_Structure = org_string.strip().split(';')  ##revisite
+                #fetch_orgname = [x for x in OrgNameDict if x in GOC_Structure[0].lower()][0] ############  ##############
+                # if GOC_Structure[0].lower() == orgname ##bcstring.lower() or GOC_Structure[0].lower() == abstring.lower():
+                #     del GOC_Structure[0]
+                #     provdata = True
+                #     curorgname = GOC_Structure[0]
+                #
+                # del GOC_Structure[0]
+
+                # Append to contributor
+                contributor_english = []
+                contributor_french = []
+
+                # At ths point you have ditched GOC and your checking for good
+                # dept names
+                for GOC_Div in GOC_Structure:
+                    # Are they in the CL?
+                    GOC_Div = GOC_Structure[0].strip() + '; ' + GOC_Div.strip()
+                    termsValue = fetchCLValue( GOC_Div, GC_Registry_of_Applied_Terms)
+                    if termsValue:
+                        contributor_english.append(termsValue[0])
+                        contributor_french.append(termsValue[2])
+                        if termsValue[1] == termsValue[3]:
+                            valid_orgs.append(termsValue[1].lower())
+                        else:
+                            valid_orgs.append((termsValue[1] + "-" + termsValue[3]).lower())
+                        break
 
-            org_strings = list(set(org_strings))
+            # Unique the departments, don't need duplicates
+            valid_orgs = list(set(valid_orgs))
 
-            if len(org_strings) < 1:
+            if len(valid_orgs) < 1:
                 reportError(
                     HNAP_fileIdentifier, [
                         schema_ref["16"]['CKAN API property'],
-                        "Bad organizationName, no Government of Canada",
-                        attempt
+                        "No valid orgs found",
+                        org_string.strip()
                     ])
             else:
-                valid_orgs = []
-                curorgname = []
-
-                for org_string in org_strings:
-                    provdata = False
-                    GOC_Structure = org_string.strip().split(';')  ##revisite
-                    #fetch_orgname = [x for x in OrgNameDict if x in GOC_Structure[0].lower()][0] ############  ##############
-                    # if GOC_Structure[0].lower() == orgname ##bcstring.lower() or GOC_Structure[0].lower() == abstring.lower():
-                    #     del GOC_Structure[0]
-                    #     provdata = True
-                    #     curorgname = GOC_Structure[0]
-                    #
-                    # del GOC_Structure[0]
-
-                    # Append to contributor
-                    contributor_english = []
-                    contributor_french = []
-
-                    # At ths point you have ditched GOC and your checking for good
-                    # dept names
-                    for GOC_Div in GOC_Structure:
-                        # Are they in the CL?
-                        GOC_Div = GOC_Structure[0].strip() + '; ' + GOC_Div.strip()
-                        termsValue = fetchCLValue( GOC_Div, GC_Registry_of_Applied_Terms)
-                        if termsValue:
-                            contributor_english.append(termsValue[0])
-                            contributor_french.append(termsValue[2])
-                            if termsValue[1] == termsValue[3]:
-                                valid_orgs.append(termsValue[1].lower())
-                            else:
-                                valid_orgs.append((termsValue[1] + "-" + termsValue[3]).lower())
-                            break
-
-                # Unique the departments, don't need duplicates
-                valid_orgs = list(set(valid_orgs))
-
-                if len(valid_orgs) < 1:
+                json_record[schema_ref["16"]['CKAN API property']] = valid_orgs[0]
+
+            # Unique the departments, don't need duplicates
+            contributor_english = list(set(contributor_english))
+            contributor_french = list(set(contributor_french))
+
+            # Multiple owners, excess pushed to contrib
+            if len(valid_orgs) > 1:
+                del valid_orgs[0]
+                if len(contributor_english) > 0:
+                    del contributor_english[0]
+                if len(contributor_english) > 0:
+                    del contributor_french[0]
+                json_record[schema_ref["22"]['CKAN API property']] = {}
+                json_record[schema_ref["22"]['CKAN API property']]['en'] = []
+                json_record[schema_ref["22"]['CKAN API property']]['fr'] = []
+                for org in valid_orgs:
+                    json_record[schema_ref["22"]['CKAN API property']]['en'] = ','.join(contributor_english)
+                    json_record[schema_ref["22"]['CKAN API property']]['fr'] = ','.join(contributor_french)
+
+        # CC::OpenMaps-17 Publisher - Organization Name at Publication (English)
+        #       CKAN defined/provided
+        # CC::OpenMaps-18 Publisher - Organization Name at Publication (French)
+        #       CKAN defined/provided
+        # CC::OpenMaps-19 Publisher - Organization Section Name (English)
+        #       CKAN defined/provided
+        # CC::OpenMaps-20 Publisher - Organization Section Name (French)
+        #       CKAN defined/provided
+
+        # CC::OpenMaps-21 Creator
+
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["21"])
+        if value:
+            json_record[schema_ref["21"]['CKAN API property']] = ','.join(value)
+
+        # CC::OpenMaps-22 Contributor (English)
+        #       Intentionally left blank, assuming singular contribution
+        # CC::OpenMaps-23 Contributor (French)
+        #       Intentionally left blank, assuming singular contribution
+
+        # CC::OpenMaps-24 Position Name (English)
+        # CC::OpenMaps-25 Position Name (French)
+
+        json_record[schema_ref["24"]['CKAN API property']] = {}
+
+        schema_ref["24"]['Occurrences'] = 'R'
+        primary_data = []
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["24"])
+        if value:
+            for single_value in value:
+                primary_data.append(value)
+
+        if len(primary_data) > 0:
+            json_record[schema_ref["24"]['CKAN API property']][CKAN_primary_lang] = ','.join(value)
+
+        schema_ref["25"]['Occurrences'] = 'R'
+        primary_data = []
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["25"])
+        if value:
+            for single_value in value:
+                primary_data.append(value)
+
+        if len(primary_data) > 0:
+            json_record[schema_ref["24"]['CKAN API property']][CKAN_secondary_lang] = ','.join(value)
+
+        if len(json_record[schema_ref["24"]['CKAN API property']]) < 1:
+            del json_record[schema_ref["24"]['CKAN API property']]
+
+        # CC::OpenMaps-26 Role
+
+        # Single report out, multiple records combined
+        schema_ref["26"]['Occurrences'] = 'R'
+        primary_data = []
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["26"])
+        if value:
+            for single_value in value:
+                # Can you find the CL entry?
+                termsValue = fetchCLValue(single_value, napCI_RoleCode)
+                if not termsValue:
                     reportError(
                         HNAP_fileIdentifier, [
-                            schema_ref["16"]['CKAN API property'],
-                            "No valid orgs found",
-                            org_string.strip()
+                            schema_ref["26"]['CKAN API property'],
+                            'Value not found in ' + schema_ref["26"]['Reference']
                         ])
                 else:
-                    json_record[schema_ref["16"]['CKAN API property']] = valid_orgs[0]
-
-                # Unique the departments, don't need duplicates
-                contributor_english = list(set(contributor_english))
-                contributor_french = list(set(contributor_french))
-
-                # Multiple owners, excess pushed to contrib
-                if len(valid_orgs) > 1:
-                    del valid_orgs[0]
-                    if len(contributor_english) > 0:
-                        del contributor_english[0]
-                    if len(contributor_english) > 0:
-                        del contributor_french[0]
-                    json_record[schema_ref["22"]['CKAN API property']] = {}
-                    json_record[schema_ref["22"]['CKAN API property']]['en'] = []
-                    json_record[schema_ref["22"]['CKAN API property']]['fr'] = []
-                    for org in valid_orgs:
-                        json_record[schema_ref["22"]['CKAN API property']]['en'] = ','.join(contributor_english)
-                        json_record[schema_ref["22"]['CKAN API property']]['fr'] = ','.join(contributor_french)
-
-            # CC::OpenMaps-17 Publisher - Organization Name at Publication (English)
-            #       CKAN defined/provided
-            # CC::OpenMaps-18 Publisher - Organization Name at Publication (French)
-            #       CKAN defined/provided
-            # CC::OpenMaps-19 Publisher - Organization Section Name (English)
-            #       CKAN defined/provided
-            # CC::OpenMaps-20 Publisher - Organization Section Name (French)
-            #       CKAN defined/provided
-
-            # CC::OpenMaps-21 Creator
-
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["21"])
-            if value:
-                json_record[schema_ref["21"]['CKAN API property']] = ','.join(value)
-
-            # CC::OpenMaps-22 Contributor (English)
-            #       Intentionally left blank, assuming singular contribution
-            # CC::OpenMaps-23 Contributor (French)
-            #       Intentionally left blank, assuming singular contribution
-
-            # CC::OpenMaps-24 Position Name (English)
-            # CC::OpenMaps-25 Position Name (French)
-
-            json_record[schema_ref["24"]['CKAN API property']] = {}
-
-            schema_ref["24"]['Occurrences'] = 'R'
-            primary_data = []
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["24"])
-            if value:
-                for single_value in value:
-                    primary_data.append(value)
-
-            if len(primary_data) > 0:
-                json_record[schema_ref["24"]['CKAN API property']][CKAN_primary_lang] = ','.join(value)
+                    primary_data.append(termsValue[0])
+
+        if len(primary_data) > 0:
+            json_record[schema_ref["26"]['CKAN API property']] = ','.join(value)
+
+        # CC::OpenMaps-27
+        #       Undefined property number
+        # CC::OpenMaps-28
+        #       Undefined property number
+
+        # CC::OpenMaps-29 Contact Information (English)
+
+        primary_vals = {}
+        primary_vals[CKAN_primary_lang] = {}
+
+        # HACK - find out of there is a pointOfContact role provided
+        ref = schema_ref["29a"]["FGP XPATH"].split("gmd:CI_ResponsibleParty")[
+                  0] + "gmd:CI_ResponsibleParty[gmd:role/gmd:CI_RoleCode[@codeListValue='RI_414']]"
+        tmp = fetchXMLValues(record, ref)
+        xpath_sub = ""
+
+        if len(tmp) > 0:
+            xpath_sub = "gmd:CI_ResponsibleParty[gmd:role/gmd:CI_RoleCode[@codeListValue='RI_414']]"
+
+        # deliveryPoint
+        # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["29a"])
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["29a"]['Requirement'],
+                                                              "Occurrences": schema_ref["29a"]['Occurrences'],
+                                                              "FGP XPATH": schema_ref["29a"]["FGP XPATH"].replace(
+                                                                  "gmd:CI_ResponsibleParty", xpath_sub),
+                                                              "Value Type": schema_ref["29a"]['Value Type'],
+                                                              "CKAN API property": schema_ref["29a"][
+                                                                  'CKAN API property']})
+
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_primary_lang]['delivery_point'] = single_value
+        # city
+        # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["29b"])
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["29b"]['Requirement'],
+                                                              "Occurrences": schema_ref["29b"]['Occurrences'],
+                                                              "FGP XPATH": schema_ref["29b"]["FGP XPATH"].replace(
+                                                                  "gmd:CI_ResponsibleParty", xpath_sub),
+                                                              "Value Type": schema_ref["29b"]['Value Type'],
+                                                              "CKAN API property": schema_ref["29b"][
+                                                                  'CKAN API property']})
+
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_primary_lang]['city'] = single_value
+        # administrativeArea
+        # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["29c"])
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["29c"]['Requirement'],
+                                                              "Occurrences": schema_ref["29c"]['Occurrences'],
+                                                              "FGP XPATH": schema_ref["29c"]["FGP XPATH"].replace(
+                                                                  "gmd:CI_ResponsibleParty", xpath_sub),
+                                                              "Value Type": schema_ref["29c"]['Value Type'],
+                                                              "CKAN API property": schema_ref["29c"][
+                                                                  'CKAN API property']})
+
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_primary_lang]['administrative_area'] = single_value
+        # postalCode
+        # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["29d"])
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["29d"]['Requirement'],
+                                                              "Occurrences": schema_ref["29d"]['Occurrences'],
+                                                              "FGP XPATH": schema_ref["29d"]["FGP XPATH"].replace(
+                                                                  "gmd:CI_ResponsibleParty", xpath_sub),
+                                                              "Value Type": schema_ref["29d"]['Value Type'],
+                                                              "CKAN API property": schema_ref["29d"][
+                                                                  'CKAN API property']})
+
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_primary_lang]['postal_code'] = single_value
+        # country
+        # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["29e"])
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["29e"]['Requirement'],
+                                                              "Occurrences": schema_ref["29e"]['Occurrences'],
+                                                              "FGP XPATH": schema_ref["29e"]["FGP XPATH"].replace(
+                                                                  "gmd:CI_ResponsibleParty", xpath_sub),
+                                                              "Value Type": schema_ref["29e"]['Value Type'],
+                                                              "CKAN API property": schema_ref["29e"][
+                                                                  'CKAN API property']})
+
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_primary_lang]['country'] = single_value
+        # electronicMailAddress
+        # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["29f"])
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["29f"]['Requirement'],
+                                                              "Occurrences": schema_ref["29f"]['Occurrences'],
+                                                              "FGP XPATH": schema_ref["29f"]["FGP XPATH"].replace(
+                                                                  "gmd:CI_ResponsibleParty", xpath_sub),
+                                                              "Value Type": schema_ref["29f"]['Value Type'],
+                                                              "CKAN API property": schema_ref["29f"][
+                                                                  'CKAN API property']})
+
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_primary_lang]['electronic_mail_address'] = single_value
+
+        if len(primary_vals[CKAN_primary_lang]) < 1:
+            reportError(
+                HNAP_fileIdentifier, [
+                    schema_ref["29"]['CKAN API property'],
+                    'Value not found in ' + schema_ref["29"]['Reference']
+                ])
+
+        # CC::OpenMaps-30 Contact Information (French)
+
+        primary_vals[CKAN_secondary_lang] = {}
+
+        # deliveryPoint
+        # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["30a"])
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["30a"]['Requirement'],
+                                                              "Occurrences": schema_ref["30a"]['Occurrences'],
+                                                              "FGP XPATH": schema_ref["30a"]["FGP XPATH"].replace(
+                                                                  "gmd:CI_ResponsibleParty", xpath_sub),
+                                                              "Value Type": schema_ref["30a"]['Value Type'],
+                                                              "CKAN API property": schema_ref["30a"][
+                                                                  'CKAN API property']})
+
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_secondary_lang]['point_de_livraison'] = single_value
+        # city
+        # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["30b"])
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["30b"]['Requirement'],
+                                                              "Occurrences": schema_ref["30b"]['Occurrences'],
+                                                              "FGP XPATH": schema_ref["30b"]["FGP XPATH"].replace(
+                                                                  "gmd:CI_ResponsibleParty", xpath_sub),
+                                                              "Value Type": schema_ref["30b"]['Value Type'],
+                                                              "CKAN API property": schema_ref["30b"][
+                                                                  'CKAN API property']})
+
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_secondary_lang]['ville'] = single_value
+        # administrativeArea
+        # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["30c"])
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["30c"]['Requirement'],
+                                                              "Occurrences": schema_ref["30c"]['Occurrences'],
+                                                              "FGP XPATH": schema_ref["30c"]["FGP XPATH"].replace(
+                                                                  "gmd:CI_ResponsibleParty", xpath_sub),
+                                                              "Value Type": schema_ref["30c"]['Value Type'],
+                                                              "CKAN API property": schema_ref["30c"][
+                                                                  'CKAN API property']})
+
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_secondary_lang]['zone_administrative'] = single_value
+        # postalCode
+        # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["30d"])
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["30d"]['Requirement'],
+                                                              "Occurrences": schema_ref["30d"]['Occurrences'],
+                                                              "FGP XPATH": schema_ref["30d"]["FGP XPATH"].replace(
+                                                                  "gmd:CI_ResponsibleParty", xpath_sub),
+                                                              "Value Type": schema_ref["30d"]['Value Type'],
+                                                              "CKAN API property": schema_ref["30d"][
+                                                                  'CKAN API property']})
+
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_secondary_lang]['code_postal'] = single_value
+        # country
+        # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["30e"])
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["30e"]['Requirement'],
+                                                              "Occurrences": schema_ref["30e"]['Occurrences'],
+                                                              "FGP XPATH": schema_ref["30e"]["FGP XPATH"].replace(
+                                                                  "gmd:CI_ResponsibleParty", xpath_sub),
+                                                              "Value Type": schema_ref["30e"]['Value Type'],
+                                                              "CKAN API property": schema_ref["30e"][
+                                                                  'CKAN API property']})
+
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_secondary_lang]['pays'] = single_value
+        # electronicMailAddress
+        # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["30f"])
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["30f"]['Requirement'],
+                                                              "Occurrences": schema_ref["30f"]['Occurrences'],
+                                                              "FGP XPATH": schema_ref["30f"]["FGP XPATH"].replace(
+                                                                  "gmd:CI_ResponsibleParty", xpath_sub),
+                                                              "Value Type": schema_ref["30f"]['Value Type'],
+                                                              "CKAN API property": schema_ref["30f"][
+                                                                  'CKAN API property']})
+
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_secondary_lang]['electronic_mail_address'] = single_value
+
+        if len(primary_vals[CKAN_secondary_lang]) < 1:
+            reportError(
+                HNAP_fileIdentifier, [
+                    schema_ref["30"]['CKAN API property'],
+                    'Value not found in ' + schema_ref["30"]['Reference']
+                ])
+
+        json_record[schema_ref["29"]['CKAN API property']] = json.dumps(primary_vals)
+
+        # CC::OpenMaps-31 Contact Email
+
+        # Single report out, multiple records combined
+        schema_ref["31"]['Occurrences'] = 'R'
+        json_record[schema_ref["31"]['CKAN API property']] = {}
+
+        # HACK - find out of there is a pointOfContact role provided
+        ref = schema_ref["31"]["FGP XPATH"].split("gmd:CI_ResponsibleParty")[
+                  0] + "gmd:CI_ResponsibleParty[gmd:role/gmd:CI_RoleCode[@codeListValue='RI_414']]"
+        tmp = fetchXMLValues(record, ref)
+        xpath_sub = ""
+
+        if len(tmp) > 0:
+            xpath_sub = "gmd:CI_ResponsibleParty[gmd:role/gmd:CI_RoleCode[@codeListValue='RI_414']]"
+
+        # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["31"])
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["31"]['Requirement'],
+                                                              "Occurrences": schema_ref["31"]['Occurrences'],
+                                                              "FGP XPATH": schema_ref["31"]["FGP XPATH"].replace(
+                                                                  "gmd:CI_ResponsibleParty", xpath_sub),
+                                                              "Value Type": schema_ref["31"]['Value Type'],
+                                                              "CKAN API property": schema_ref["31"][
+                                                                  'CKAN API property']})
+
+        # primary_data = []
+        # if value:
+        #     for single_value in value:
+        #         primary_data.append(single_value)
+
+        # if len(primary_data) > 0:
+        #     json_record[schema_ref["31"]['CKAN API property']] = ','.join(value)
+
+        # Check for valid email
+        if value:
+            value = value[0].split(',')  # revisite
+            isprovemail = False
+            for email in value:
+                isValidEmail = re.match(r'(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)', email.strip())
+            if not isprovemail and isValidEmail == None:
 
-            schema_ref["25"]['Occurrences'] = 'R'
-            primary_data = []
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["25"])
-            if value:
-                for single_value in value:
-                    primary_data.append(value)
+                reportError(
+                    HNAP_fileIdentifier, [
+                        schema_ref["31"]['CKAN API property'],
+                        "Invalid Email",
+                        value[0]
+                    ])
+            else:
+                json_record[schema_ref["31"]['CKAN API property']] = value[0]
+        else:
+            reportError(
+                HNAP_fileIdentifier, [
+                    schema_ref["31"]['CKAN API property'],
+                    "Invalid Email",
+                    ''
+                ])
+
+        # CC::OpenMaps-32 Description (English)
+
+        json_record[schema_ref["32"]['CKAN API property']] = {}
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["32a"])
+        value_old = value
+        if value:
+            # format line breaks
+            value = value.replace('\n', '  \n  \n  ')
+            value = value.replace('----------------------------------------------------------',
+                                  '  \n  \n  ----------------------------------------------------------  \n  \n  ')
 
-            if len(primary_data) > 0:
-                json_record[schema_ref["24"]['CKAN API property']][CKAN_secondary_lang] = ','.join(value)
+            json_record[
+                schema_ref["32"]['CKAN API property']
+            ][schema_ref["32a"]['CKAN API property'].split('.')[1]] = value
 
-            if len(json_record[schema_ref["24"]['CKAN API property']]) < 1:
-                del json_record[schema_ref["24"]['CKAN API property']]
+        # XXX Check that there are values
 
-            # CC::OpenMaps-26 Role
+        # CC::OpenMaps-33 Description (French)
 
-            # Single report out, multiple records combined
-            schema_ref["26"]['Occurrences'] = 'R'
-            primary_data = []
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["26"])
-            if value:
-                for single_value in value:
-                    # Can you find the CL entry?
-                    termsValue = fetchCLValue(single_value, napCI_RoleCode)
-                    if not termsValue:
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["32b"])
+        value_old = value
+        if value:
+            # format line breaks
+            value = value.replace('\n', '  \n  \n  ')
+            value = value.replace('----------------------------------------------------------',
+                                  '  \n  \n  ----------------------------------------------------------  \n  \n  ')
+                                  
+            json_record[
+                schema_ref["32"]['CKAN API property']
+            ][schema_ref["32b"]['CKAN API property'].split('.')[1]] = value
+
+        # XXX Check that there are values
+
+        # CC::OpenMaps-34 Keywords (English)
+
+        primary_vals = []
+        json_record[schema_ref["34"]['CKAN API property']] = {}
+        json_record[schema_ref["34"]['CKAN API property']][schema_ref["34a"]['CKAN API property'].split('.')[1]] = []
+
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["34a"])
+        if value:
+            for single_value in value:
+                p = re.compile('^[A-Z][A-Z] [^>]+ > ')
+                single_value = p.sub('', single_value)
+                single_value = single_value.strip()
+
+                # ADAPTATION #4
+                # 2016-05-27 - call
+                # Alexandre Bolieux asked I replace commas with something valid.  I'm replacing them with semi-colons
+                # which can act as a seperator character like the comma but get past that reserved character
+                single_value = single_value.replace(',', ';')
+                # END ADAPTATION
+                # remove multiple spaces
+                single_value = re.sub(r'\s+', ' ', single_value)
+                keyword_error = canada_tags(single_value).replace('"', '""')
+
+                # ADAPTATION #5
+                # 2016-05-27 - call
+                # Alexandre Bolieux asked if I could replace commas with something valid.  I'm
+                # replacing them with semi-colons which can act as a seperator character like
+                # the comma but get past that reserved character
+                if re.search('length is more than maximum 140', keyword_error, re.UNICODE):
+                    pass
+                else:
+                    # END ADAPTATION
+                    if not keyword_error == '':
+                        # if not re.search(schema_ref["34"]['RegEx Filter'], single_value,re.UNICODE):
                         reportError(
                             HNAP_fileIdentifier, [
-                                schema_ref["26"]['CKAN API property'],
-                                'Value not found in ' + schema_ref["26"]['Reference']
+                                schema_ref["34"]['CKAN API property'] + '-' + CKAN_primary_lang,
+                                "Invalid Keyword",
+                                keyword_error
+                                # "Must be alpha-numeric, space or '-_./>+& ["+single_value+']'
                             ])
                     else:
-                        primary_data.append(termsValue[0])
-
-            if len(primary_data) > 0:
-                json_record[schema_ref["26"]['CKAN API property']] = ','.join(value)
-
-            # CC::OpenMaps-27
-            #       Undefined property number
-            # CC::OpenMaps-28
-            #       Undefined property number
-
-            # CC::OpenMaps-29 Contact Information (English)
-
-            primary_vals = {}
-            primary_vals[CKAN_primary_lang] = {}
-
-            # HACK - find out of there is a pointOfContact role provided
-            ref = schema_ref["29a"]["FGP XPATH"].split("gmd:CI_ResponsibleParty")[
-                      0] + "gmd:CI_ResponsibleParty[gmd:role/gmd:CI_RoleCode[@codeListValue='RI_414']]"
-            tmp = fetchXMLValues(record, ref)
-            xpath_sub = ""
-
-            if len(tmp) > 0:
-                xpath_sub = "gmd:CI_ResponsibleParty[gmd:role/gmd:CI_RoleCode[@codeListValue='RI_414']]"
-
-            # deliveryPoint
-            # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["29a"])
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["29a"]['Requirement'],
-                                                                  "Occurrences": schema_ref["29a"]['Occurrences'],
-                                                                  "FGP XPATH": schema_ref["29a"]["FGP XPATH"].replace(
-                                                                      "gmd:CI_ResponsibleParty", xpath_sub),
-                                                                  "Value Type": schema_ref["29a"]['Value Type'],
-                                                                  "CKAN API property": schema_ref["29a"][
-                                                                      'CKAN API property']})
-
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_primary_lang]['delivery_point'] = single_value
-            # city
-            # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["29b"])
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["29b"]['Requirement'],
-                                                                  "Occurrences": schema_ref["29b"]['Occurrences'],
-                                                                  "FGP XPATH": schema_ref["29b"]["FGP XPATH"].replace(
-                                                                      "gmd:CI_ResponsibleParty", xpath_sub),
-                                                                  "Value Type": schema_ref["29b"]['Value Type'],
-                                                                  "CKAN API property": schema_ref["29b"][
-                                                                      'CKAN API property']})
-
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_primary_lang]['city'] = single_value
-            # administrativeArea
-            # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["29c"])
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["29c"]['Requirement'],
-                                                                  "Occurrences": schema_ref["29c"]['Occurrences'],
-                                                                  "FGP XPATH": schema_ref["29c"]["FGP XPATH"].replace(
-                                                                      "gmd:CI_ResponsibleParty", xpath_sub),
-                                                                  "Value Type": schema_ref["29c"]['Value Type'],
-                                                                  "CKAN API property": schema_ref["29c"][
-                                                                      'CKAN API property']})
-
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_primary_lang]['administrative_area'] = single_value
-            # postalCode
-            # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["29d"])
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["29d"]['Requirement'],
-                                                                  "Occurrences": schema_ref["29d"]['Occurrences'],
-                                                                  "FGP XPATH": schema_ref["29d"]["FGP XPATH"].replace(
-                                                                      "gmd:CI_ResponsibleParty", xpath_sub),
-                                                                  "Value Type": schema_ref["29d"]['Value Type'],
-                                                                  "CKAN API property": schema_ref["29d"][
-                                                                      'CKAN API property']})
-
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_primary_lang]['postal_code'] = single_value
-            # country
-            # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["29e"])
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["29e"]['Requirement'],
-                                                                  "Occurrences": schema_ref["29e"]['Occurrences'],
-                                                                  "FGP XPATH": schema_ref["29e"]["FGP XPATH"].replace(
-                                                                      "gmd:CI_ResponsibleParty", xpath_sub),
-                                                                  "Value Type": schema_ref["29e"]['Value Type'],
-                                                                  "CKAN API property": schema_ref["29e"][
-                                                                      'CKAN API property']})
-
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_primary_lang]['country'] = single_value
-            # electronicMailAddress
-            # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["29f"])
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["29f"]['Requirement'],
-                                                                  "Occurrences": schema_ref["29f"]['Occurrences'],
-                                                                  "FGP XPATH": schema_ref["29f"]["FGP XPATH"].replace(
-                                                                      "gmd:CI_ResponsibleParty", xpath_sub),
-                                                                  "Value Type": schema_ref["29f"]['Value Type'],
-                                                                  "CKAN API property": schema_ref["29f"][
-                                                                      'CKAN API property']})
-
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_primary_lang]['electronic_mail_address'] = single_value
-
-            if len(primary_vals[CKAN_primary_lang]) < 1:
+                        if single_value not in json_record[schema_ref["34"]['CKAN API property']][schema_ref["34a"]['CKAN API property'].split('.')[1]]:
+                            json_record[schema_ref["34"]['CKAN API property']][schema_ref["34a"]['CKAN API property'].split('.')[1]].append(
+                                single_value)
+
+        #                        if not len(json_record[schema_ref["34"]['CKAN API property']][CKAN_primary_lang]):
+        #                            reportError(
+        #                                HNAP_fileIdentifier,[
+        #                                    schema_ref["34"]['CKAN API property']+'-'+CKAN_primary_lang,
+        #                                    "No keywords"
+        #                                ])
+
+        # CC::OpenMaps-35 Keywords (French)
+
+        # json_record[schema_ref["34"]['CKAN API property']][CKAN_secondary_lang] = []
+        json_record[schema_ref["34"]['CKAN API property']][schema_ref["34b"]['CKAN API property'].split('.')[1]] = []
+
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["34b"])
+        if value:
+            for single_value in value:
+                p = re.compile('^[A-Z][A-Z] [^>]+ > ')
+                single_value = p.sub('', single_value)
+                # ADAPTATION #4
+                # 2016-05-27 - call
+                # Alexandre Bolieux asked if I could replace commas with something valid.  I'm
+                # replacing them with semi-colons which can act as a seperator character like
+                # the comma but get past that reserved character
+                single_value = single_value.replace(',', ';')
+                # END ADAPTATION
+                single_value = re.sub(r'\s+', ' ', single_value)
+                keyword_error = canada_tags(single_value).replace('"', '""')
+
+                # ADAPTATION #5
+                # 2016-05-27 - call
+                # Alexandre Bolieux asked I drop keywords that exceed 140 characters
+                if re.search('length is more than maximum 140', keyword_error, re.UNICODE):
+                    pass
+                else:
+                    # END ADAPTATION
+                    if not keyword_error == '':
+                        # if not re.search(schema_ref["34"]['RegEx Filter'], single_value,re.UNICODE):
+                        reportError(
+                            HNAP_fileIdentifier, [
+                                schema_ref["34"]['CKAN API property'] + '-' + CKAN_secondary_lang,
+                                "Invalid Keyword",
+                                keyword_error
+                                # 'Must be alpha-numeric, space or -_./>+& ['+single_value+']'
+                            ])
+                    else:
+                        if single_value not in json_record[schema_ref["34"]['CKAN API property']][schema_ref["34b"]['CKAN API property'].split('.')[1]]:
+                            json_record[schema_ref["34"]['CKAN API property']][schema_ref["34b"]['CKAN API property'].split('.')[1]].append(single_value)
+
+                            # json_record[schema_ref["34"]['CKAN API property']][CKAN_secondary_lang].append(single_value)
+
+        #                        if not len(json_record[schema_ref["34"]['CKAN API property']][CKAN_secondary_lang]):
+        #                            reportError(
+        #                                HNAP_fileIdentifier,[
+        #                                    schema_ref["34"]['CKAN API property']+'-'+CKAN_secondary_lang,
+        #                                    "No keywords"
+        #                                ])
+
+        # CC::OpenMaps-36 Subject
+
+        subject_values = []
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["36"])
+        if value:
+            for subject in value:
+                termsValue = fetchCLValue(
+                    subject.strip(), CL_Subjects)
+                if termsValue:
+                    for single_item in termsValue[3].split(','):
+                        subject_values.append(single_item.strip().lower())
+
+            if len(subject_values) < 1:
                 reportError(
                     HNAP_fileIdentifier, [
-                        schema_ref["29"]['CKAN API property'],
-                        'Value not found in ' + schema_ref["29"]['Reference']
+                        schema_ref["36"]['CKAN API property'],
+                        'Value not found in ' + schema_ref["36"]['Reference']
                     ])
+            else:
+                json_record[schema_ref["36"]['CKAN API property']] = list(set(subject_values))
 
-            # CC::OpenMaps-30 Contact Information (French)
-
-            primary_vals[CKAN_secondary_lang] = {}
-
-            # deliveryPoint
-            # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["30a"])
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["30a"]['Requirement'],
-                                                                  "Occurrences": schema_ref["30a"]['Occurrences'],
-                                                                  "FGP XPATH": schema_ref["30a"]["FGP XPATH"].replace(
-                                                                      "gmd:CI_ResponsibleParty", xpath_sub),
-                                                                  "Value Type": schema_ref["30a"]['Value Type'],
-                                                                  "CKAN API property": schema_ref["30a"][
-                                                                      'CKAN API property']})
-
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_secondary_lang]['point_de_livraison'] = single_value
-            # city
-            # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["30b"])
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["30b"]['Requirement'],
-                                                                  "Occurrences": schema_ref["30b"]['Occurrences'],
-                                                                  "FGP XPATH": schema_ref["30b"]["FGP XPATH"].replace(
-                                                                      "gmd:CI_ResponsibleParty", xpath_sub),
-                                                                  "Value Type": schema_ref["30b"]['Value Type'],
-                                                                  "CKAN API property": schema_ref["30b"][
-                                                                      'CKAN API property']})
-
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_secondary_lang]['ville'] = single_value
-            # administrativeArea
-            # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["30c"])
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["30c"]['Requirement'],
-                                                                  "Occurrences": schema_ref["30c"]['Occurrences'],
-                                                                  "FGP XPATH": schema_ref["30c"]["FGP XPATH"].replace(
-                                                                      "gmd:CI_ResponsibleParty", xpath_sub),
-                                                                  "Value Type": schema_ref["30c"]['Value Type'],
-                                                                  "CKAN API property": schema_ref["30c"][
-                                                                      'CKAN API property']})
-
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_secondary_lang]['zone_administrative'] = single_value
-            # postalCode
-            # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["30d"])
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["30d"]['Requirement'],
-                                                                  "Occurrences": schema_ref["30d"]['Occurrences'],
-                                                                  "FGP XPATH": schema_ref["30d"]["FGP XPATH"].replace(
-                                                                      "gmd:CI_ResponsibleParty", xpath_sub),
-                                                                  "Value Type": schema_ref["30d"]['Value Type'],
-                                                                  "CKAN API property": schema_ref["30d"][
-                                                                      'CKAN API property']})
-
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_secondary_lang]['code_postal'] = single_value
-            # country
-            # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["30e"])
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["30e"]['Requirement'],
-                                                                  "Occurrences": schema_ref["30e"]['Occurrences'],
-                                                                  "FGP XPATH": schema_ref["30e"]["FGP XPATH"].replace(
-                                                                      "gmd:CI_ResponsibleParty", xpath_sub),
-                                                                  "Value Type": schema_ref["30e"]['Value Type'],
-                                                                  "CKAN API property": schema_ref["30e"][
-                                                                      'CKAN API property']})
+        # CC::OpenMaps-37 Topic Category
 
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_secondary_lang]['pays'] = single_value
-            # electronicMailAddress
-            # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["30f"])
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["30f"]['Requirement'],
-                                                                  "Occurrences": schema_ref["30f"]['Occurrences'],
-                                                                  "FGP XPATH": schema_ref["30f"]["FGP XPATH"].replace(
-                                                                      "gmd:CI_ResponsibleParty", xpath_sub),
-                                                                  "Value Type": schema_ref["30f"]['Value Type'],
-                                                                  "CKAN API property": schema_ref["30f"][
-                                                                      'CKAN API property']})
+        topicCategory_values = []
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["37"])
+        if value:
+            for topicCategory in value:
+                termsValue = fetchCLValue(
+                    topicCategory.strip(), napMD_KeywordTypeCode)
+                if termsValue:
+                    topicCategory_values.append(termsValue[0])
 
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_secondary_lang]['electronic_mail_address'] = single_value
-
-            if len(primary_vals[CKAN_secondary_lang]) < 1:
+            if len(topicCategory_values) < 1:
                 reportError(
                     HNAP_fileIdentifier, [
-                        schema_ref["30"]['CKAN API property'],
-                        'Value not found in ' + schema_ref["30"]['Reference']
+                        schema_ref["37"]['CKAN API property'],
+                        'Value not found in ' + schema_ref["37"]['Reference']
                     ])
+            else:
+                json_record[schema_ref["37"]['CKAN API property']] = topicCategory_values
+
+        # CC::OpenMaps-38 Audience
+        # TBS 2016-04-13: Not in HNAP, we can skip
+
+        # CC::OpenMaps-39 Place of Publication (English)
+        # TBS 2016-04-13: Not in HNAP, we can skip
+
+        # CC::OpenMaps-40 Place of Publication  (French)
+        # TBS 2016-04-13: Not in HNAP, we can skip
+
+        # CC::OpenMaps-41 Spatial
+
+        north = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["41n"])
+        if north:
+            south = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["41s"])
+            if south:
+                east = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["41e"])
+                if east:
+                    west = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["41w"])
+                    if west:
+                        # ensure we have proper numbers
+                        north = [float(north[0]) if '.' in north[0] else int(north[0])]
+                        east = [float(east[0]) if '.' in east[0] else int(east[0])]
+                        south = [float(south[0]) if '.' in south[0] else int(south[0])]
+                        west = [float(west[0]) if '.' in west[0] else int(west[0])]
+
+                        GeoJSON = {}
+                        GeoJSON['type'] = "Polygon"
+                        GeoJSON['coordinates'] = [[
+                            [west, south],
+                            [east, south],
+                            [east, north],
+                            [west, north],
+                            [west, south]
+                        ]]
+
+                        # json_record[schema_ref["41"]['CKAN API property']] = json.dumps(GeoJSON)
+                        json_record[schema_ref["41"][
+                            'CKAN API property']] = '{"type": "Polygon","coordinates": [[[%s,%s],[%s,%s],[%s,%s],[%s,%s],[%s,%s]]]}' % (
+                        west[0], south[0], east[0], south[0], east[0], north[0], west[0], north[0], west[0],
+                        south[0])
+
+        # CC::OpenMaps-42 Geographic Region Name
+        # TBS 2016-04-13: Not in HNAP, we can skip (the only providing the bounding box, not the region name)
+
+        # CC::OpenMaps-43 Time Period Coverage Start Date
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["43"])
+        if value:
+            if sanityDate(
+                    HNAP_fileIdentifier, [
+                        schema_ref["43"]['CKAN API property'] + '-start'
+                    ],
+                    maskDate(value)
+            ):
+                json_record[schema_ref["43"]['CKAN API property']] = maskDate(value)
+
+        # CC::OpenMaps-44 Time Period Coverage End Date
+        #   ADAPTATION #2
+        #     CKAN (or Solr) requires an end date where one doesn't exist.  An open
+        #     record should run without an end date.  Since this is not the case a
+        #     '9999-99-99' is used in lieu.
+        #   ADAPTATION #3
+        #     Temporal elements are ISO 8601 date objects but this field may be
+        #     left blank (invalid).
+        #     The intent is to use a blank field as a maker for an "open" record
+        #     were omission of this field would be standard practice.  No
+        #     gml:endPosition = no end.
+        #     Since changing the source seems to be impossible we adapt by
+        #     replacing a blank entry with the equally ugly '9999-99-99' forced
+        #     end in CKAN.
+
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["44"])
+        if value:
+
+            check_for_blank = value
+            if check_for_blank == '':
+                check_for_blank = '9999-09-09'
+
+            if sanityDate(
+                    HNAP_fileIdentifier, [
+                        schema_ref["44"]['CKAN API property'] + '-end'
+                    ],
+                    maskDate(check_for_blank)
+            ):
+                json_record[schema_ref["44"]['CKAN API property']] = maskDate(check_for_blank)
 
-            json_record[schema_ref["29"]['CKAN API property']] = json.dumps(primary_vals)
-
-            # CC::OpenMaps-31 Contact Email
-
-            # Single report out, multiple records combined
-            schema_ref["31"]['Occurrences'] = 'R'
-            json_record[schema_ref["31"]['CKAN API property']] = {}
-
-            # HACK - find out of there is a pointOfContact role provided
-            ref = schema_ref["31"]["FGP XPATH"].split("gmd:CI_ResponsibleParty")[
-                      0] + "gmd:CI_ResponsibleParty[gmd:role/gmd:CI_RoleCode[@codeListValue='RI_414']]"
-            tmp = fetchXMLValues(record, ref)
-            xpath_sub = ""
-
-            if len(tmp) > 0:
-                xpath_sub = "gmd:CI_ResponsibleParty[gmd:role/gmd:CI_RoleCode[@codeListValue='RI_414']]"
-
-            # value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["31"])
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, {"Requirement": schema_ref["31"]['Requirement'],
-                                                                  "Occurrences": schema_ref["31"]['Occurrences'],
-                                                                  "FGP XPATH": schema_ref["31"]["FGP XPATH"].replace(
-                                                                      "gmd:CI_ResponsibleParty", xpath_sub),
-                                                                  "Value Type": schema_ref["31"]['Value Type'],
-                                                                  "CKAN API property": schema_ref["31"][
-                                                                      'CKAN API property']})
-
-            # primary_data = []
-            # if value:
-            #     for single_value in value:
-            #         primary_data.append(single_value)
-
-            # if len(primary_data) > 0:
-            #     json_record[schema_ref["31"]['CKAN API property']] = ','.join(value)
-
-            # Check for valid email
-            if value:
-                value = value[0].split(',')  # revisite
-                isprovemail = False
-                for email in value:
-                    isValidEmail = re.match(r'(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)', email.strip())
-                if not isprovemail and isValidEmail == None:
+        # CC::OpenMaps-45 Maintenance and Update Frequency
 
-                    reportError(
-                        HNAP_fileIdentifier, [
-                            schema_ref["31"]['CKAN API property'],
-                            "Invalid Email",
-                            value[0]
-                        ])
-                else:
-                    json_record[schema_ref["31"]['CKAN API property']] = value[0]
-            else:
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["45"])
+        if value:
+            # Can you find the CL entry?
+            termsValue = fetchCLValue(value, napMD_MaintenanceFrequencyCode)
+            if not termsValue:
                 reportError(
                     HNAP_fileIdentifier, [
-                        schema_ref["31"]['CKAN API property'],
-                        "Invalid Email",
-                        ''
+                        schema_ref["45"]['CKAN API property'],
+                        'Value not found in ' + schema_ref["45"]['Reference']
                     ])
+            else:
+                json_record[schema_ref["45"]['CKAN API property']] = termsValue[2]
+
+        # CC::OpenMaps-46 Date Published
+        # CC::OpenMaps-47 Date Modified
+
+        ##################################################
+        # These are a little different, we have to do these odd birds manually
+        r = record.xpath(
+            schema_ref["46"]["FGP XPATH"],
+            namespaces={
+                'gmd': 'http://www.isotc211.org/2005/gmd',
+                'gco': 'http://www.isotc211.org/2005/gco'})
+
+        if (len(r)):
+            for cn in r:
+                input_types = {}
+                inKey = []
+                inVal = ''
+                # Decypher which side has the code and which has the data,
+                # yea... it changes -sigh-
+                # Keys will always use the ;
+                try:
+                    if cn[0][0].text is not None and len(cn[0][0].text.split(';')) > 1:
+                        inKey = cn[0][0].text.split(';')
+                        inVal = cn[1][0].text.strip()
+                    elif cn[1][0].text is not None:
+                        inKey = cn[1][0].text.split(';')
+                        inVal = cn[0][0].text.strip()
+                except:
+                    pass
 
-            # CC::OpenMaps-32 Description (English)
-
-            json_record[schema_ref["32"]['CKAN API property']] = {}
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["32a"])
-            value_old = value
-            if value:
-                # format line breaks
-                value = value.replace('\n', '  \n  \n  ')
-                value = value.replace('----------------------------------------------------------',
-                                      '  \n  \n  ----------------------------------------------------------  \n  \n  ')
-
-                json_record[
-                    schema_ref["32"]['CKAN API property']
-                ][schema_ref["32a"]['CKAN API property'].split('.')[1]] = value
+                for input_type in inKey:
+                    input_type = input_type.strip()
+                    if input_type == u'publication':
+                        if sanityDate(
+                                HNAP_fileIdentifier, [
+                                    schema_ref["46"]['CKAN API property']
+                                ],
+                                maskDate(inVal)):
+                            json_record[schema_ref["46"]['CKAN API property']] = maskDate(inVal)
+                            break
 
-            # XXX Check that there are values
+                    if input_type == u'revision' or input_type == u'révision':
+                        if sanityDate(
+                                HNAP_fileIdentifier, [
+                                    schema_ref["47"]['CKAN API property']
+                                ],
+                                maskDate(inVal)):
+                            json_record[schema_ref["47"]['CKAN API property']] = maskDate(inVal)
+                            break
 
-            # CC::OpenMaps-33 Description (French)
+            # Check the field is populated if you have to
+            if schema_ref["46"]['Requirement'] == 'M' and schema_ref["46"]['CKAN API property'] not in json_record:
+                reportError(
+                    HNAP_fileIdentifier, [
+                        schema_ref["46"]['CKAN API property'],
+                        'Value not found in ' + schema_ref["46"]['Reference']
+                    ])
 
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["32b"])
-            value_old = value
-            if value:
-                # format line breaks
-                value = value.replace('\n', '  \n  \n  ')
-                value = value.replace('----------------------------------------------------------',
-                                      '  \n  \n  ----------------------------------------------------------  \n  \n  ')
-                                      
-                json_record[
-                    schema_ref["32"]['CKAN API property']
-                ][schema_ref["32b"]['CKAN API property'].split('.')[1]] = value
+            # Check the field is populated if you have to
+            if schema_ref["47"]['Requirement'] == 'M' and schema_ref["47"]['CKAN API property'] not in json_record:
+                reportError(
+                    HNAP_fileIdentifier, [
+                        schema_ref["47"]['CKAN API property'],
+                        'Value not found in ' + schema_ref["47"]['Reference']
+                    ])
 
-            # XXX Check that there are values
+        if 'date_published' not in json_record:
+            reportError(
+                HNAP_fileIdentifier, [
+                    schema_ref["46"]['CKAN API property'],
+                    'mandatory field missing'
+                ])
 
-            # CC::OpenMaps-34 Keywords (English)
+        # CC::OpenMaps-48 Date Released
+        # SYSTEM GENERATED
 
-            primary_vals = []
-            json_record[schema_ref["34"]['CKAN API property']] = {}
-            json_record[schema_ref["34"]['CKAN API property']][schema_ref["34a"]['CKAN API property'].split('.')[1]] = []
+        # CC::OpenMaps-49 Homepage URL (English)
+        # TBS 2016-04-13: Not in HNAP, we can skip
+        # CC::OpenMaps-50 Homepage URL (French)
+        # TBS 2016-04-13: Not in HNAP, we can skip
 
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["34a"])
-            if value:
-                for single_value in value:
-                    p = re.compile('^[A-Z][A-Z] [^>]+ > ')
-                    single_value = p.sub('', single_value)
-                    single_value = single_value.strip()
-
-                    # ADAPTATION #4
-                    # 2016-05-27 - call
-                    # Alexandre Bolieux asked I replace commas with something valid.  I'm replacing them with semi-colons
-                    # which can act as a seperator character like the comma but get past that reserved character
-                    single_value = single_value.replace(',', ';')
-                    # END ADAPTATION
-                    # remove multiple spaces
-                    single_value = re.sub(r'\s+', ' ', single_value)
-                    keyword_error = canada_tags(single_value).replace('"', '""')
-
-                    # ADAPTATION #5
-                    # 2016-05-27 - call
-                    # Alexandre Bolieux asked if I could replace commas with something valid.  I'm
-                    # replacing them with semi-colons which can act as a seperator character like
-                    # the comma but get past that reserved character
-                    if re.search('length is more than maximum 140', keyword_error, re.UNICODE):
-                        pass
-                    else:
-                        # END ADAPTATION
-                        if not keyword_error == '':
-                            # if not re.search(schema_ref["34"]['RegEx Filter'], single_value,re.UNICODE):
-                            reportError(
-                                HNAP_fileIdentifier, [
-                                    schema_ref["34"]['CKAN API property'] + '-' + CKAN_primary_lang,
-                                    "Invalid Keyword",
-                                    keyword_error
-                                    # "Must be alpha-numeric, space or '-_./>+& ["+single_value+']'
-                                ])
-                        else:
-                            if single_value not in json_record[schema_ref["34"]['CKAN API property']][schema_ref["34a"]['CKAN API property'].split('.')[1]]:
-                                json_record[schema_ref["34"]['CKAN API property']][schema_ref["34a"]['CKAN API property'].split('.')[1]].append(
-                                    single_value)
+        # CC::OpenMaps-51 Series Name (English)
+        # TBS 2016-04-13: Not in HNAP, we can skip
+        # CC::OpenMaps-52 Series Name (French)
+        # TBS 2016-04-13: Not in HNAP, we can skip
 
-            #                        if not len(json_record[schema_ref["34"]['CKAN API property']][CKAN_primary_lang]):
-            #                            reportError(
-            #                                HNAP_fileIdentifier,[
-            #                                    schema_ref["34"]['CKAN API property']+'-'+CKAN_primary_lang,
-            #                                    "No keywords"
-            #                                ])
+        # CC::OpenMaps-53 Series Issue Identification (English)
+        # TBS 2016-04-13: Not in HNAP, we can skip
+        # CC::OpenMaps-54 Series Issue Identification (French)
+        # TBS 2016-04-13: Not in HNAP, we can skip
 
-            # CC::OpenMaps-35 Keywords (French)
+        # CC::OpenMaps-55 Digital Object Identifier
+        # TBS 2016-04-13: Not in HNAP, we can skip
 
-            # json_record[schema_ref["34"]['CKAN API property']][CKAN_secondary_lang] = []
-            json_record[schema_ref["34"]['CKAN API property']][schema_ref["34b"]['CKAN API property'].split('.')[1]] = []
+        # CC::OpenMaps-56 Reference System Information
 
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["34b"])
-            if value:
-                for single_value in value:
-                    p = re.compile('^[A-Z][A-Z] [^>]+ > ')
-                    single_value = p.sub('', single_value)
-                    # ADAPTATION #4
-                    # 2016-05-27 - call
-                    # Alexandre Bolieux asked if I could replace commas with something valid.  I'm
-                    # replacing them with semi-colons which can act as a seperator character like
-                    # the comma but get past that reserved character
-                    single_value = single_value.replace(',', ';')
-                    # END ADAPTATION
-                    single_value = re.sub(r'\s+', ' ', single_value)
-                    keyword_error = canada_tags(single_value).replace('"', '""')
-
-                    # ADAPTATION #5
-                    # 2016-05-27 - call
-                    # Alexandre Bolieux asked I drop keywords that exceed 140 characters
-                    if re.search('length is more than maximum 140', keyword_error, re.UNICODE):
-                        pass
-                    else:
-                        # END ADAPTATION
-                        if not keyword_error == '':
-                            # if not re.search(schema_ref["34"]['RegEx Filter'], single_value,re.UNICODE):
-                            reportError(
-                                HNAP_fileIdentifier, [
-                                    schema_ref["34"]['CKAN API property'] + '-' + CKAN_secondary_lang,
-                                    "Invalid Keyword",
-                                    keyword_error
-                                    # 'Must be alpha-numeric, space or -_./>+& ['+single_value+']'
-                                ])
-                        else:
-                            if single_value not in json_record[schema_ref["34"]['CKAN API property']][schema_ref["34b"]['CKAN API property'].split('.')[1]]:
-                                json_record[schema_ref["34"]['CKAN API property']][schema_ref["34b"]['CKAN API property'].split('.')[1]].append(single_value)
+        # Allow for multiple refrence definitions
+        # Updated implementation mimics prior behaviour.
+        possible_refrences = fetchXMLArray(
+            record,
+            schema_ref["56"]['FGP XPATH'])
 
-                                # json_record[schema_ref["34"]['CKAN API property']][CKAN_secondary_lang].append(single_value)
+        # print '--------------------------------------'
+        # print possible_refrences
+        # print '--------------------------------------'
 
-            #                        if not len(json_record[schema_ref["34"]['CKAN API property']][CKAN_secondary_lang]):
-            #                            reportError(
-            #                                HNAP_fileIdentifier,[
-            #                                    schema_ref["34"]['CKAN API property']+'-'+CKAN_secondary_lang,
-            #                                    "No keywords"
-            #                                ])
+        if len(possible_refrences) == 0:
+            reportError(
+                HNAP_fileIdentifier, [
+                    schema_ref["56"]['CKAN API property'],
+                    'No projection information found'
+                ])
+        else:
+            first_full_triplet = ''
+            for possible_refrence in possible_refrences:
+                vala = valb = valc = ''
 
-            # CC::OpenMaps-36 Subject
+                # code
+                value = fetch_FGP_value(possible_refrence, HNAP_fileIdentifier, schema_ref["56a"])
+                if value:
+                    vala = value
+                # codeSpace
+                value = fetch_FGP_value(possible_refrence, HNAP_fileIdentifier, schema_ref["56b"])
+                if value:
+                    valb = value
+                # version
+                value = fetch_FGP_value(possible_refrence, HNAP_fileIdentifier, schema_ref["56c"])
+                if value:
+                    valc = value
 
-            subject_values = []
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["36"])
-            if value:
-                for subject in value:
-                    termsValue = fetchCLValue(
-                        subject.strip(), CL_Subjects)
-                    if termsValue:
-                        for single_item in termsValue[3].split(','):
-                            subject_values.append(single_item.strip().lower())
+                # Apply your business logic, this is the same logic as before assuming a single projection
+                # If this is to become multiple projections the property needs to be changed into an array
+                # in the schema and _then_ in CKAN.
+                if vala != '' and valb != '' and valc != '':
+                    first_full_triplet = vala + ',' + valb + ',' + valc
+                    json_record[schema_ref["56"]['CKAN API property']] = first_full_triplet
+                    break
 
-                if len(subject_values) < 1:
-                    reportError(
-                        HNAP_fileIdentifier, [
-                            schema_ref["36"]['CKAN API property'],
-                            'Value not found in ' + schema_ref["36"]['Reference']
-                        ])
-                else:
-                    json_record[schema_ref["36"]['CKAN API property']] = list(set(subject_values))
+            # if the triplet is not complete then fail over to just the mandatory HNAP requirement
+            if first_full_triplet == '':
 
-            # CC::OpenMaps-37 Topic Category
+                rs_identifier = fetch_FGP_value(possible_refrences[0], HNAP_fileIdentifier, schema_ref["56a"])
 
-            topicCategory_values = []
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["37"])
-            if value:
-                for topicCategory in value:
-                    termsValue = fetchCLValue(
-                        topicCategory.strip(), napMD_KeywordTypeCode)
-                    if termsValue:
-                        topicCategory_values.append(termsValue[0])
+                if len(rs_identifier) > 0:
+                    first_full_triplet = rs_identifier + ',' + fetch_FGP_value(possible_refrences[0],
+                                                                               HNAP_fileIdentifier, schema_ref[
+                                                                                   "56b"]) + ',' + fetch_FGP_value(
+                        possible_refrences[0], HNAP_fileIdentifier, schema_ref["56c"])
 
-                if len(topicCategory_values) < 1:
+                if first_full_triplet == '':
                     reportError(
                         HNAP_fileIdentifier, [
-                            schema_ref["37"]['CKAN API property'],
-                            'Value not found in ' + schema_ref["37"]['Reference']
+                            schema_ref["56"]['CKAN API property'],
+                            'Complete triplet not found'
                         ])
-                else:
-                    json_record[schema_ref["37"]['CKAN API property']] = topicCategory_values
-
-            # CC::OpenMaps-38 Audience
-            # TBS 2016-04-13: Not in HNAP, we can skip
-
-            # CC::OpenMaps-39 Place of Publication (English)
-            # TBS 2016-04-13: Not in HNAP, we can skip
-
-            # CC::OpenMaps-40 Place of Publication  (French)
-            # TBS 2016-04-13: Not in HNAP, we can skip
-
-            # CC::OpenMaps-41 Spatial
-
-            north = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["41n"])
-            if north:
-                south = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["41s"])
-                if south:
-                    east = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["41e"])
-                    if east:
-                        west = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["41w"])
-                        if west:
-                            # ensure we have proper numbers
-                            north = [float(north[0]) if '.' in north[0] else int(north[0])]
-                            east = [float(east[0]) if '.' in east[0] else int(east[0])]
-                            south = [float(south[0]) if '.' in south[0] else int(south[0])]
-                            west = [float(west[0]) if '.' in west[0] else int(west[0])]
-
-                            GeoJSON = {}
-                            GeoJSON['type'] = "Polygon"
-                            GeoJSON['coordinates'] = [[
-                                [west, south],
-                                [east, south],
-                                [east, north],
-                                [west, north],
-                                [west, south]
-                            ]]
-
-                            # json_record[schema_ref["41"]['CKAN API property']] = json.dumps(GeoJSON)
-                            json_record[schema_ref["41"][
-                                'CKAN API property']] = '{"type": "Polygon","coordinates": [[[%s,%s],[%s,%s],[%s,%s],[%s,%s],[%s,%s]]]}' % (
-                            west[0], south[0], east[0], south[0], east[0], north[0], west[0], north[0], west[0],
-                            south[0])
-
-            # CC::OpenMaps-42 Geographic Region Name
-            # TBS 2016-04-13: Not in HNAP, we can skip (the only providing the bounding box, not the region name)
-
-            # CC::OpenMaps-43 Time Period Coverage Start Date
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["43"])
-            if value:
-                if sanityDate(
-                        HNAP_fileIdentifier, [
-                            schema_ref["43"]['CKAN API property'] + '-start'
-                        ],
-                        maskDate(value)
-                ):
-                    json_record[schema_ref["43"]['CKAN API property']] = maskDate(value)
-
-            # CC::OpenMaps-44 Time Period Coverage End Date
-            #   ADAPTATION #2
-            #     CKAN (or Solr) requires an end date where one doesn't exist.  An open
-            #     record should run without an end date.  Since this is not the case a
-            #     '9999-99-99' is used in lieu.
-            #   ADAPTATION #3
-            #     Temporal elements are ISO 8601 date objects but this field may be
-            #     left blank (invalid).
-            #     The intent is to use a blank field as a maker for an "open" record
-            #     were omission of this field would be standard practice.  No
-            #     gml:endPosition = no end.
-            #     Since changing the source seems to be impossible we adapt by
-            #     replacing a blank entry with the equally ugly '9999-99-99' forced
-            #     end in CKAN.
-
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["44"])
-            if value:
-
-                check_for_blank = value
-                if check_for_blank == '':
-                    check_for_blank = '9999-09-09'
-
-                if sanityDate(
-                        HNAP_fileIdentifier, [
-                            schema_ref["44"]['CKAN API property'] + '-end'
-                        ],
-                        maskDate(check_for_blank)
-                ):
-                    json_record[schema_ref["44"]['CKAN API property']] = maskDate(check_for_blank)
 
-            # CC::OpenMaps-45 Maintenance and Update Frequency
-
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["45"])
-            if value:
+        # CC::OpenMaps-57 Distributor (English)
+
+        primary_vals = {}
+        primary_vals[CKAN_primary_lang] = {}
+        primary_vals[CKAN_secondary_lang] = {}
+
+        # organizationName
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57a"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_primary_lang]['organization_name'] = single_value
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58a"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_secondary_lang]['nom_organization'] = single_value
+
+        # phone
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57b"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_primary_lang]['phone'] = single_value
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58b"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_secondary_lang]['telephone'] = single_value
+
+        # address
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57c"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_primary_lang]['address'] = single_value
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58c"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_secondary_lang]['adresse'] = single_value
+
+        # city
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57d"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_primary_lang]['city'] = single_value
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58d"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_secondary_lang]['ville'] = single_value
+
+        # administrativeArea
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57e"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_primary_lang]['administrative_area'] = single_value
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58e"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_secondary_lang]['zone_administrative'] = single_value
+
+        # postalCode
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57f"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_primary_lang]['postal_code'] = single_value
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58f"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_secondary_lang]['code_postal'] = single_value
+
+        # country
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57g"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_primary_lang]['country'] = single_value
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58g"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_secondary_lang]['pays'] = single_value
+
+        # electronicMailAddress  mandatory
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57h"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_primary_lang]['electronic_mail_address'] = single_value
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58h"])
+        if value:
+            for single_value in value:
+                primary_vals[CKAN_secondary_lang]['electronic_mail_address'] = single_value
+
+        # role mandatory
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57i"])
+        if value:
+            for single_value in value:
                 # Can you find the CL entry?
-                termsValue = fetchCLValue(value, napMD_MaintenanceFrequencyCode)
+                termsValue = fetchCLValue(single_value, napCI_RoleCode)
                 if not termsValue:
                     reportError(
                         HNAP_fileIdentifier, [
-                            schema_ref["45"]['CKAN API property'],
-                            'Value not found in ' + schema_ref["45"]['Reference']
+                            schema_ref["57"]['CKAN API property'],
+                            'Value not found in ' + schema_ref["57"]['Reference']
                         ])
                 else:
-                    json_record[schema_ref["45"]['CKAN API property']] = termsValue[2]
-
-            # CC::OpenMaps-46 Date Published
-            # CC::OpenMaps-47 Date Modified
-
-            ##################################################
-            # These are a little different, we have to do these odd birds manually
-            r = record.xpath(
-                schema_ref["46"]["FGP XPATH"],
-                namespaces={
-                    'gmd': 'http://www.isotc211.org/2005/gmd',
-                    'gco': 'http://www.isotc211.org/2005/gco'})
-
-            if (len(r)):
-                for cn in r:
-                    input_types = {}
-                    inKey = []
-                    inVal = ''
-                    # Decypher which side has the code and which has the data,
-                    # yea... it changes -sigh-
-                    # Keys will always use the ;
-                    try:
-                        if cn[0][0].text is not None and len(cn[0][0].text.split(';')) > 1:
-                            inKey = cn[0][0].text.split(';')
-                            inVal = cn[1][0].text.strip()
-                        elif cn[1][0].text is not None:
-                            inKey = cn[1][0].text.split(';')
-                            inVal = cn[0][0].text.strip()
-                    except:
-                        pass
-
-                    for input_type in inKey:
-                        input_type = input_type.strip()
-                        if input_type == u'publication':
-                            if sanityDate(
-                                    HNAP_fileIdentifier, [
-                                        schema_ref["46"]['CKAN API property']
-                                    ],
-                                    maskDate(inVal)):
-                                json_record[schema_ref["46"]['CKAN API property']] = maskDate(inVal)
-                                break
-
-                        if input_type == u'revision' or input_type == u'révision':
-                            if sanityDate(
-                                    HNAP_fileIdentifier, [
-                                        schema_ref["47"]['CKAN API property']
-                                    ],
-                                    maskDate(inVal)):
-                                json_record[schema_ref["47"]['CKAN API property']] = maskDate(inVal)
-                                break
-
-                # Check the field is populated if you have to
-                if schema_ref["46"]['Requirement'] == 'M' and schema_ref["46"]['CKAN API property'] not in json_record:
-                    reportError(
-                        HNAP_fileIdentifier, [
-                            schema_ref["46"]['CKAN API property'],
-                            'Value not found in ' + schema_ref["46"]['Reference']
-                        ])
-
-                # Check the field is populated if you have to
-                if schema_ref["47"]['Requirement'] == 'M' and schema_ref["47"]['CKAN API property'] not in json_record:
-                    reportError(
-                        HNAP_fileIdentifier, [
-                            schema_ref["47"]['CKAN API property'],
-                            'Value not found in ' + schema_ref["47"]['Reference']
-                        ])
-
-            if 'date_published' not in json_record:
-                reportError(
-                    HNAP_fileIdentifier, [
-                        schema_ref["46"]['CKAN API property'],
-                        'mandatory field missing'
-                    ])
-
-            # CC::OpenMaps-48 Date Released
-            # SYSTEM GENERATED
+                    primary_vals[CKAN_primary_lang]['role'] = termsValue[0]
+                    primary_vals[CKAN_secondary_lang]['role'] = termsValue[1]
 
-            # CC::OpenMaps-49 Homepage URL (English)
-            # TBS 2016-04-13: Not in HNAP, we can skip
-            # CC::OpenMaps-50 Homepage URL (French)
-            # TBS 2016-04-13: Not in HNAP, we can skip
-
-            # CC::OpenMaps-51 Series Name (English)
-            # TBS 2016-04-13: Not in HNAP, we can skip
-            # CC::OpenMaps-52 Series Name (French)
-            # TBS 2016-04-13: Not in HNAP, we can skip
-
-            # CC::OpenMaps-53 Series Issue Identification (English)
-            # TBS 2016-04-13: Not in HNAP, we can skip
-            # CC::OpenMaps-54 Series Issue Identification (French)
-            # TBS 2016-04-13: Not in HNAP, we can skip
-
-            # CC::OpenMaps-55 Digital Object Identifier
-            # TBS 2016-04-13: Not in HNAP, we can skip
-
-            # CC::OpenMaps-56 Reference System Information
+        json_record[schema_ref["57"]['CKAN API property']] = json.dumps(primary_vals)
 
-            # Allow for multiple refrence definitions
-            # Updated implementation mimics prior behaviour.
-            possible_refrences = fetchXMLArray(
-                record,
-                schema_ref["56"]['FGP XPATH'])
+        # json_record[schema_ref["57"]['CKAN API property']] = {}
+        # json_record[schema_ref["57"]['CKAN API property']][CKAN_primary_lang] = ','.join(primary_vals)
+        # json_record[schema_ref["57"]['CKAN API property']][CKAN_secondary_lang] = ','.join(second_vals)
 
-            # print '--------------------------------------'
-            # print possible_refrences
-            # print '--------------------------------------'
+        # CC::OpenMaps-59 Status
 
-            if len(possible_refrences) == 0:
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["59"])
+        if value:
+            # Can you find the CL entry?
+            termsValue = fetchCLValue(value, napMD_ProgressCode)
+            if not termsValue:
                 reportError(
                     HNAP_fileIdentifier, [
-                        schema_ref["56"]['CKAN API property'],
-                        'No projection information found'
+                        schema_ref["59"]['CKAN API property'],
+                        'Value not found in ' + schema_ref["59"]['Reference']
                     ])
             else:
-                first_full_triplet = ''
-                for possible_refrence in possible_refrences:
-                    vala = valb = valc = ''
-
-                    # code
-                    value = fetch_FGP_value(possible_refrence, HNAP_fileIdentifier, schema_ref["56a"])
-                    if value:
-                        vala = value
-                    # codeSpace
-                    value = fetch_FGP_value(possible_refrence, HNAP_fileIdentifier, schema_ref["56b"])
-                    if value:
-                        valb = value
-                    # version
-                    value = fetch_FGP_value(possible_refrence, HNAP_fileIdentifier, schema_ref["56c"])
-                    if value:
-                        valc = value
-
-                    # Apply your business logic, this is the same logic as before assuming a single projection
-                    # If this is to become multiple projections the property needs to be changed into an array
-                    # in the schema and _then_ in CKAN.
-                    if vala != '' and valb != '' and valc != '':
-                        first_full_triplet = vala + ',' + valb + ',' + valc
-                        json_record[schema_ref["56"]['CKAN API property']] = first_full_triplet
-                        break
+                json_record[schema_ref["59"]['CKAN API property']] = termsValue[0]
 
-                # if the triplet is not complete then fail over to just the mandatory HNAP requirement
-                if first_full_triplet == '':
+        # CC::OpenMaps-60 Association Type
 
-                    rs_identifier = fetch_FGP_value(possible_refrences[0], HNAP_fileIdentifier, schema_ref["56a"])
+        associationTypes_array = []
 
-                    if len(rs_identifier) > 0:
-                        first_full_triplet = rs_identifier + ',' + fetch_FGP_value(possible_refrences[0],
-                                                                                   HNAP_fileIdentifier, schema_ref[
-                                                                                       "56b"]) + ',' + fetch_FGP_value(
-                            possible_refrences[0], HNAP_fileIdentifier, schema_ref["56c"])
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["60"])
 
-                    if first_full_triplet == '':
-                        reportError(
-                            HNAP_fileIdentifier, [
-                                schema_ref["56"]['CKAN API property'],
-                                'Complete triplet not found'
-                            ])
-
-            # CC::OpenMaps-57 Distributor (English)
-
-            primary_vals = {}
-            primary_vals[CKAN_primary_lang] = {}
-            primary_vals[CKAN_secondary_lang] = {}
-
-            # organizationName
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57a"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_primary_lang]['organization_name'] = single_value
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58a"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_secondary_lang]['nom_organization'] = single_value
+        # Not mandatory, process if you have it
+        if value and len(value) > 0:
 
-            # phone
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57b"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_primary_lang]['phone'] = single_value
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58b"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_secondary_lang]['telephone'] = single_value
-
-            # address
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57c"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_primary_lang]['address'] = single_value
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58c"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_secondary_lang]['adresse'] = single_value
+            # You have to iterate to find a valid one, not necessarily the
+            for associationType in value:
+                # Can you find the CL entry?
+                termsValue = fetchCLValue(
+                    associationType, napDS_AssociationTypeCode)
+                if not termsValue:
+                    termsValue = []
+                else:
+                    associationTypes_array.append(termsValue[2])
 
-            # city
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57d"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_primary_lang]['city'] = single_value
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58d"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_secondary_lang]['ville'] = single_value
+        if len(associationTypes_array):
+            json_record[schema_ref["60"]['CKAN API property']] = ','.join(associationTypes_array)
 
-            # administrativeArea
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57e"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_primary_lang]['administrative_area'] = single_value
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58e"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_secondary_lang]['zone_administrative'] = single_value
+        # CC::OpenMaps-61 Aggregate Dataset Identifier
 
-            # postalCode
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57f"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_primary_lang]['postal_code'] = single_value
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58f"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_secondary_lang]['code_postal'] = single_value
+        aggregateDataSetIdentifier_array = []
 
-            # country
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57g"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_primary_lang]['country'] = single_value
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58g"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_secondary_lang]['pays'] = single_value
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["61"])
+        # Not mandatory, process if you have it
+        if value and len(value) > 0:
 
-            # electronicMailAddress  mandatory
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57h"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_primary_lang]['electronic_mail_address'] = single_value
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["58h"])
-            if value:
-                for single_value in value:
-                    primary_vals[CKAN_secondary_lang]['electronic_mail_address'] = single_value
+            try:
+                for aggregateDataSetIdentifier in value:
+                    (primary, secondary) = \
+                        aggregateDataSetIdentifier.strip().split(';')
+                    aggregateDataSetIdentifier_array.append(primary.strip())
+                    aggregateDataSetIdentifier_array.append(secondary.strip())
+            except ValueError:
+                errorInfo = [schema_ref["61"]['CKAN API property']]
+                errorInfo.append('primary/secondary identifiers not provided/valid')
+                errorInfo.append(aggregateDataSetIdentifier.strip())
+                reportError(HNAP_fileIdentifier, errorInfo)
+                pass
 
-            # role mandatory
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["57i"])
-            if value:
-                for single_value in value:
-                    # Can you find the CL entry?
-                    termsValue = fetchCLValue(single_value, napCI_RoleCode)
-                    if not termsValue:
-                        reportError(
-                            HNAP_fileIdentifier, [
-                                schema_ref["57"]['CKAN API property'],
-                                'Value not found in ' + schema_ref["57"]['Reference']
-                            ])
-                    else:
-                        primary_vals[CKAN_primary_lang]['role'] = termsValue[0]
-                        primary_vals[CKAN_secondary_lang]['role'] = termsValue[1]
+        json_record[schema_ref["61"]['CKAN API property']] = ','.join(
+            aggregateDataSetIdentifier_array)
 
-            json_record[schema_ref["57"]['CKAN API property']] = json.dumps(primary_vals)
+        # CC::OpenMaps-62 Spatial Representation Type
 
-            # json_record[schema_ref["57"]['CKAN API property']] = {}
-            # json_record[schema_ref["57"]['CKAN API property']][CKAN_primary_lang] = ','.join(primary_vals)
-            # json_record[schema_ref["57"]['CKAN API property']][CKAN_secondary_lang] = ','.join(second_vals)
+        value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["62"])
 
-            # CC::OpenMaps-59 Status
+        json_record[schema_ref["62"]['CKAN API property']] = {}
+        spatialRepresentationType_array = []
 
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["59"])
-            if value:
+        if value:
+            # You have to itterate to find a valid one,
+            # not neccesaraly the first
+            for spatialRepresentationType in value:
                 # Can you find the CL entry?
-                termsValue = fetchCLValue(value, napMD_ProgressCode)
+                termsValue = fetchCLValue(
+                    spatialRepresentationType,
+                    napMD_SpatialRepresentationTypeCode)
                 if not termsValue:
-                    reportError(
-                        HNAP_fileIdentifier, [
-                            schema_ref["59"]['CKAN API property'],
-                            'Value not found in ' + schema_ref["59"]['Reference']
-                        ])
+                    termsValue = []
                 else:
-                    json_record[schema_ref["59"]['CKAN API property']] = termsValue[0]
+                    spatialRepresentationType_array.append(termsValue[0])
 
-            # CC::OpenMaps-60 Association Type
+        # json_record[schema_ref["62"]['CKAN API property']] = ','.join(
+        # spatialRepresentationType_array)
 
-            associationTypes_array = []
+        json_record[schema_ref["62"]['CKAN API property']] = spatialRepresentationType_array
 
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["60"])
+        # CC::OpenMaps-63 Jurisdiction
+        # TBS 2016-04-13: Not in HNAP, but can we default text to ‘Federal’ / ‘Fédéral
 
-            # Not mandatory, process if you have it
-            if value and len(value) > 0:
+        json_record[schema_ref["63"]['CKAN API property']] = schema_ref["63"]['FGP XPATH']
 
-                # You have to iterate to find a valid one, not necessarily the
-                for associationType in value:
-                    # Can you find the CL entry?
-                    termsValue = fetchCLValue(
-                        associationType, napDS_AssociationTypeCode)
-                    if not termsValue:
-                        termsValue = []
-                    else:
-                        associationTypes_array.append(termsValue[2])
+        if org_name.lower().find('government of canada') == -1:
+            json_record[schema_ref["63"]['CKAN API property']] = schema_ref["63p"]['FGP XPATH']
 
-            if len(associationTypes_array):
-                json_record[schema_ref["60"]['CKAN API property']] = ','.join(associationTypes_array)
 
-            # CC::OpenMaps-61 Aggregate Dataset Identifier
+        if fetch_nunicipalname:
+            json_record[schema_ref["63"]['CKAN API property']] = schema_ref["63m"]['FGP XPATH']
 
-            aggregateDataSetIdentifier_array = []
+        # CC::OpenMaps-64 Licence
+        # TBS (call): use ca-ogl-lgo
 
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["61"])
-            # Not mandatory, process if you have it
-            if value and len(value) > 0:
 
-                try:
-                    for aggregateDataSetIdentifier in value:
-                        (primary, secondary) = \
-                            aggregateDataSetIdentifier.strip().split(';')
-                        aggregateDataSetIdentifier_array.append(primary.strip())
-                        aggregateDataSetIdentifier_array.append(secondary.strip())
-                except ValueError:
-                    errorInfo = [schema_ref["61"]['CKAN API property']]
-                    errorInfo.append('primary/secondary identifiers not provided/valid')
-                    errorInfo.append(aggregateDataSetIdentifier.strip())
-                    reportError(HNAP_fileIdentifier, errorInfo)
-                    pass
+        def SetLicence(kindex):
+            json_record[schema_ref["64"]['CKAN API property']] = schema_ref[kindex]['FGP XPATH']
 
-            json_record[schema_ref["61"]['CKAN API property']] = ','.join(
-                aggregateDataSetIdentifier_array)
+        fetch_orgname = [x for x in OrgNameDict if x.lower() in org_name.lower()]
+        if len(fetch_orgname) > 0:
+            SetLicence(licencekey[fetch_orgname[0]])
 
-            # CC::OpenMaps-62 Spatial Representation Type
+        # json_record[schema_ref["64"]['CKAN API property']] = schema_ref["64"]['FGP XPATH']
 
-            value = fetch_FGP_value(record, HNAP_fileIdentifier, schema_ref["62"])
+        # if org_name.lower().find('government of alberta') != -1:
+        #     json_record[schema_ref["64"]['CKAN API property']] = schema_ref["64ab"]['FGP XPATH']
+        # elif org_name.lower().find('government of british columbia') != -1:
+        #     json_record[schema_ref["64"]['CKAN API property']] = schema_ref["64bc"]['FGP XPATH']
 
-            json_record[schema_ref["62"]['CKAN API property']] = {}
-            spatialRepresentationType_array = []
+        # choice[string](parameters)
 
-            if value:
-                # You have to itterate to find a valid one,
-                # not neccesaraly the first
-                for spatialRepresentationType in value:
-                    # Can you find the CL entry?
-                    termsValue = fetchCLValue(
-                        spatialRepresentationType,
-                        napMD_SpatialRepresentationTypeCode)
-                    if not termsValue:
-                        termsValue = []
-                    else:
-                        spatialRepresentationType_array.append(termsValue[0])
+        # CC::OpenMaps-65 Unique Identifier
+        # System generated
 
-            # json_record[schema_ref["62"]['CKAN API property']] = ','.join(
-            # spatialRepresentationType_array)
+        #### Resources
 
-            json_record[schema_ref["62"]['CKAN API property']] = spatialRepresentationType_array
+        # CC::OpenMaps-68 Date Published
+        # TBS 2016-04-13: Not in HNAP, we can skip
 
-            # CC::OpenMaps-63 Jurisdiction
-            # TBS 2016-04-13: Not in HNAP, but can we default text to ‘Federal’ / ‘Fédéral
+        json_record['resources'] = []
+        record_resources = fetchXMLArray(
+            record,
+            "gmd:distributionInfo/" +
+            "gmd:MD_Distribution/" +
+            "gmd:transferOptions/" +
+            "gmd:MD_DigitalTransferOptions/" +
+            "gmd:onLine/" +
+            "gmd:CI_OnlineResource")
 
-            json_record[schema_ref["63"]['CKAN API property']] = schema_ref["63"]['FGP XPATH']
+        resource_no = 0
+        for resource in record_resources:
 
-            if org_name.lower().find('government of canada') == -1:
-                json_record[schema_ref["63"]['CKAN API property']] = schema_ref["63p"]['FGP XPATH']
+            resource_no += 1
 
+            json_record_resource = {}
+            json_record_resource[schema_ref["66"]['CKAN API property']] = {}
 
-            if fetch_nunicipalname:
-                json_record[schema_ref["63"]['CKAN API property']] = schema_ref["63m"]['FGP XPATH']
+            # CC::OpenMaps-66 Title (English)
 
-            # CC::OpenMaps-64 Licence
-            # TBS (call): use ca-ogl-lgo
+            value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["66a"])
+            if value:
+                json_record_resource[schema_ref["66"]['CKAN API property']][schema_ref["66a"]['CKAN API property'].split('.')[1]]  = value
 
+            # CC::OpenMaps-67 Title (English)
 
-            def SetLicence(kindex):
-                json_record[schema_ref["64"]['CKAN API property']] = schema_ref[kindex]['FGP XPATH']
+            value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["66b"])
+            if value:
+                json_record_resource[schema_ref["66"]['CKAN API property']][schema_ref["66b"]['CKAN API property'].split('.')[1]] = value
+            
 
-            fetch_orgname = [x for x in OrgNameDict if x.lower() in org_name.lower()]
-            if len(fetch_orgname) > 0:
-                SetLicence(licencekey[fetch_orgname[0]])
+            # CC::OpenMaps-69 Resource Type
+            # CC::OpenMaps-70 Format
+            # CC::OpenMaps-73 Language
 
-            # json_record[schema_ref["64"]['CKAN API property']] = schema_ref["64"]['FGP XPATH']
+            value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["69-70-73"])
+            if value:
+                description_text = value.strip()
 
-            # if org_name.lower().find('government of alberta') != -1:
-            #     json_record[schema_ref["64"]['CKAN API property']] = schema_ref["64ab"]['FGP XPATH']
-            # elif org_name.lower().find('government of british columbia') != -1:
-            #     json_record[schema_ref["64"]['CKAN API property']] = schema_ref["64bc"]['FGP XPATH']
+                if description_text.count(';') != 2:
+                    reportError(
+                        HNAP_fileIdentifier, [
+                            schema_ref["69-70-73"]['CKAN API property'],
+                            'Content, Format or Language missing, must be: contentType;format;lang,lang',
+                            description_text
+                        ])
+                else:
+                    (res_contentType, res_format,
+                     res_language) = description_text.split(';')
+
+                    languages_in = res_language.strip().split(',')
+                    languages_out = []
+                    for language in languages_in:
+                        if language.strip() == 'eng':
+                            languages_out.append('en')
+                        if language.strip() == 'fra':
+                            languages_out.append('fr')
+                        if language.strip() == 'zxx':  # Non linguistic
+                            languages_out.append('zxx')
+                    # language_str = ','.join(languages_out)
+                    language_str = []
+                    for langStr in languages_out:
+                        language_str.append(langStr)
+
+                    json_record_resource[schema_ref["69"]['CKAN API property']] = res_contentType.strip().lower()
+                    json_record_resource[schema_ref["70"]['CKAN API property']] = res_format.strip()
+                    json_record_resource[schema_ref["73"]['CKAN API property']] = language_str
+
+                    # XXX Super duper hack
+                    if json_record_resource[schema_ref["69"]['CKAN API property']] == 'document de soutien':
+                        json_record_resource[schema_ref["69"]['CKAN API property']] = 'guide'
+                    if json_record_resource[schema_ref["69"]['CKAN API property']] == 'supporting document':
+                        json_record_resource[schema_ref["69"]['CKAN API property']] = 'guide'
+                    if json_record_resource[schema_ref["69"]['CKAN API property']] == 'Supporting Documents':
+                        json_record_resource[schema_ref["69"]['CKAN API property']] = 'guide'
+                    if json_record_resource[schema_ref["69"]['CKAN API property']] == 'Supporting Document':
+                        json_record_resource[schema_ref["69"]['CKAN API property']] = 'guide'
+                    if json_record_resource[schema_ref["69"]['CKAN API property']] == u'données':
+                        json_record_resource[schema_ref["69"]['CKAN API property']] = 'dataset'
+
+                    if json_record_resource[schema_ref["70"]['CKAN API property']] == 'Web App':
+                        json_record_resource[schema_ref["70"]['CKAN API property']] = 'HTML'
+                    if json_record_resource[schema_ref["70"]['CKAN API property']] == 'IOS Application':
+                        json_record_resource[schema_ref["70"]['CKAN API property']] = 'IPA'
+                    if json_record_resource[schema_ref["70"]['CKAN API property']] == 'Blackberry Application':
+                        json_record_resource[schema_ref["70"]['CKAN API property']] = 'COD'
+                    if json_record_resource[schema_ref["70"]['CKAN API property']] == 'Windows Mobile':
+                        json_record_resource[schema_ref["70"]['CKAN API property']] = 'EXE'
+                    if json_record_resource[schema_ref["70"]['CKAN API property']] == 'Android Application':
+                        json_record_resource[schema_ref["70"]['CKAN API property']] = 'APK'
+                    if json_record_resource[schema_ref["70"]['CKAN API property']] == 'GeoJSON':
+                        json_record_resource[schema_ref["70"]['CKAN API property']] = 'GEOJSON'
+                    if json_record_resource[schema_ref["70"]['CKAN API property']] == 'dxf':
+                        json_record_resource[schema_ref["70"]['CKAN API property']] = 'DXF'
 
-            # choice[string](parameters)
+            else:
+                reportError(
+                    HNAP_fileIdentifier, [
+                        schema_ref["69-70-73"]['CKAN API property'],
+                        'format,mandatory field missing'
+                    ])
+                reportError(
+                    HNAP_fileIdentifier, [
+                        schema_ref["69-70-73"]['CKAN API property'],
+                        'language,mandatory field missing'
+                    ])
+                reportError(
+                    HNAP_fileIdentifier, [
+                        schema_ref["69-70-73"]['CKAN API property'],
+                        'contentType,mandatory field missing'
+                    ])
 
-            # CC::OpenMaps-65 Unique Identifier
-            # System generated
+            if json_record_resource[schema_ref["69"]['CKAN API property']].lower() not in ResourceType:
+                reportError(
+                    HNAP_fileIdentifier, [
+                        schema_ref["69-70-73"]['CKAN API property'],
+                        'invalid resource type',
+                        json_record_resource[schema_ref["69"]['CKAN API property']]
+                    ])
+            else:
+                json_record_resource[schema_ref["69"]['CKAN API property']] = \
+                ResourceType[json_record_resource[schema_ref["69"]['CKAN API property']].lower()][0]
 
-            #### Resources
+            if json_record_resource[schema_ref["70"]['CKAN API property']] not in CL_Formats:
+                reportError(
+                    HNAP_fileIdentifier, [
+                        schema_ref["69-70-73"]['CKAN API property'],
+                        'invalid resource format',
+                        json_record_resource[schema_ref["70"]['CKAN API property']]
+                    ])
 
-            # CC::OpenMaps-68 Date Published
+            # CC::OpenMaps-71 Character Set
+            # TBS 2016-04-13: Not in HNAP, we can skip
+            # CC::OpenMaps-74 Size
             # TBS 2016-04-13: Not in HNAP, we can skip
 
-            json_record['resources'] = []
-            record_resources = fetchXMLArray(
-                record,
-                "gmd:distributionInfo/" +
-                "gmd:MD_Distribution/" +
-                "gmd:transferOptions/" +
-                "gmd:MD_DigitalTransferOptions/" +
-                "gmd:onLine/" +
-                "gmd:CI_OnlineResource")
-
-            resource_no = 0
-            for resource in record_resources:
+            # CC::OpenMaps-74 Download URL
 
-                resource_no += 1
+            value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["74"])
+            if value:
+                json_record_resource[schema_ref["74"]['CKAN API property']] = value
+            else:
+                reportError(
+                    HNAP_fileIdentifier, [
+                        schema_ref["74"]['CKAN API property'],
+                        'URL, mandatory field missing'
+                    ])
 
-                json_record_resource = {}
-                json_record_resource[schema_ref["66"]['CKAN API property']] = {}
+            # # CC::OpenMaps-75 Title (English)
+            # # XXX Need to confirm why this is not included
+            # json_record[schema_ref["75"]['CKAN API property']] = {}
 
-                # CC::OpenMaps-66 Title (English)
+            # value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["75"])
+            # if value:
+            #     json_record[schema_ref["75"]['CKAN API property']][CKAN_primary_lang] = value
 
-                value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["66a"])
-                if value:
-                    json_record_resource[schema_ref["66"]['CKAN API property']][schema_ref["66a"]['CKAN API property'].split('.')[1]]  = value
+            # # CC::OpenMaps-76 Title (French)
+            # # XXX Need to confirm why this is not included
+            # value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["75b"])
+            # if value:
+            #     json_record[schema_ref["75"]['CKAN API property']][schema_ref["75b"]['CKAN API property'].split('.')[1]] = value
 
-                # CC::OpenMaps-67 Title (English)
+            # CC::OpenMaps-76 Record Type
+            # TBS 2016-04-13: Not in HNAP, we can skip
+            # CC::OpenMaps-78 Relationship Type
+            # TBS 2016-04-13: Not in HNAP, we can skip
+            # CC::OpenMaps-79 Language
+            # TBS 2016-04-13: Not in HNAP, we can skip
+            # CC::OpenMaps-80 Record URL
+            # TBS 2016-04-13: Not in HNAP, we can skip
 
-                value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["66b"])
-                if value:
-                    json_record_resource[schema_ref["66"]['CKAN API property']][schema_ref["66b"]['CKAN API property'].split('.')[1]] = value
-                
+            # CC::OpenMaps-81 Mappable
+            # Stored as a generic Display Flag in preperation for other forms of visualizations
 
-                # CC::OpenMaps-69 Resource Type
-                # CC::OpenMaps-70 Format
-                # CC::OpenMaps-73 Language
+            # if schema_ref["81"]['CKAN API property'] not in json_record:
+            #    can_be_used_in_RAMP = False
+            #    json_record[schema_ref["81"]['CKAN API property']] = can_be_used_in_RAMP
 
-                value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["69-70-73"])
+            # If false check if true now
+            if not can_be_used_in_RAMP:
+                value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["81"])
                 if value:
-                    description_text = value.strip()
-
-                    if description_text.count(';') != 2:
-                        reportError(
-                            HNAP_fileIdentifier, [
-                                schema_ref["69-70-73"]['CKAN API property'],
-                                'Content, Format or Language missing, must be: contentType;format;lang,lang',
-                                description_text
-                            ])
-                    else:
-                        (res_contentType, res_format,
-                         res_language) = description_text.split(';')
-
-                        languages_in = res_language.strip().split(',')
-                        languages_out = []
-                        for language in languages_in:
-                            if language.strip() == 'eng':
-                                languages_out.append('en')
-                            if language.strip() == 'fra':
-                                languages_out.append('fr')
-                            if language.strip() == 'zxx':  # Non linguistic
-                                languages_out.append('zxx')
-                        # language_str = ','.join(languages_out)
-                        language_str = []
-                        for langStr in languages_out:
-                            language_str.append(langStr)
-
-                        json_record_resource[schema_ref["69"]['CKAN API property']] = res_contentType.strip().lower()
-                        json_record_resource[schema_ref["70"]['CKAN API property']] = res_format.strip()
-                        json_record_resource[schema_ref["73"]['CKAN API property']] = language_str
-
-                        # XXX Super duper hack
-                        if json_record_resource[schema_ref["69"]['CKAN API property']] == 'document de soutien':
-                            json_record_resource[schema_ref["69"]['CKAN API property']] = 'guide'
-                        if json_record_resource[schema_ref["69"]['CKAN API property']] == 'supporting document':
-                            json_record_resource[schema_ref["69"]['CKAN API property']] = 'guide'
-                        if json_record_resource[schema_ref["69"]['CKAN API property']] == 'Supporting Documents':
-                            json_record_resource[schema_ref["69"]['CKAN API property']] = 'guide'
-                        if json_record_resource[schema_ref["69"]['CKAN API property']] == 'Supporting Document':
-                            json_record_resource[schema_ref["69"]['CKAN API property']] = 'guide'
-                        if json_record_resource[schema_ref["69"]['CKAN API property']] == u'données':
-                            json_record_resource[schema_ref["69"]['CKAN API property']] = 'dataset'
-
-                        if json_record_resource[schema_ref["70"]['CKAN API property']] == 'Web App':
-                            json_record_resource[schema_ref["70"]['CKAN API property']] = 'HTML'
-                        if json_record_resource[schema_ref["70"]['CKAN API property']] == 'IOS Application':
-                            json_record_resource[schema_ref["70"]['CKAN API property']] = 'IPA'
-                        if json_record_resource[schema_ref["70"]['CKAN API property']] == 'Blackberry Application':
-                            json_record_resource[schema_ref["70"]['CKAN API property']] = 'COD'
-                        if json_record_resource[schema_ref["70"]['CKAN API property']] == 'Windows Mobile':
-                            json_record_resource[schema_ref["70"]['CKAN API property']] = 'EXE'
-                        if json_record_resource[schema_ref["70"]['CKAN API property']] == 'Android Application':
-                            json_record_resource[schema_ref["70"]['CKAN API property']] = 'APK'
-                        if json_record_resource[schema_ref["70"]['CKAN API property']] == 'GeoJSON':
-                            json_record_resource[schema_ref["70"]['CKAN API property']] = 'GEOJSON'
-                        if json_record_resource[schema_ref["70"]['CKAN API property']] == 'dxf':
-                            json_record_resource[schema_ref["70"]['CKAN API property']] = 'DXF'
-
-                else:
-                    reportError(
-                        HNAP_fileIdentifier, [
-                            schema_ref["69-70-73"]['CKAN API property'],
-                            'format,mandatory field missing'
-                        ])
-                    reportError(
-                        HNAP_fileIdentifier, [
-                            schema_ref["69-70-73"]['CKAN API property'],
-                            'language,mandatory field missing'
-                        ])
-                    reportError(
-                        HNAP_fileIdentifier, [
-                            schema_ref["69-70-73"]['CKAN API property'],
-                            'contentType,mandatory field missing'
-                        ])
-
-                if json_record_resource[schema_ref["69"]['CKAN API property']].lower() not in ResourceType:
-                    reportError(
-                        HNAP_fileIdentifier, [
-                            schema_ref["69-70-73"]['CKAN API property'],
-                            'invalid resource type',
-                            json_record_resource[schema_ref["69"]['CKAN API property']]
-                        ])
-                else:
-                    json_record_resource[schema_ref["69"]['CKAN API property']] = \
-                    ResourceType[json_record_resource[schema_ref["69"]['CKAN API property']].lower()][0]
-
-                if json_record_resource[schema_ref["70"]['CKAN API property']] not in CL_Formats:
-                    reportError(
-                        HNAP_fileIdentifier, [
-                            schema_ref["69-70-73"]['CKAN API property'],
-                            'invalid resource format',
-                            json_record_resource[schema_ref["70"]['CKAN API property']]
-                        ])
+                    protocol_desc = value.strip()
+                    if protocol_desc in mappable_protocols:
+                        can_be_used_in_RAMP = True
+
+                        # check to see if the URL is HTTPS
+                        value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["74"])
+                        # if value[:value.find(":")] == 'http':
+                        # print "No HTTPS: " + HNAP_fileIdentifier
+                        if value:
+                            can_be_used_in_RAMP = value[:value.find(":")] == 'https'
+
+            # Append the resource to the Open Maps record
+            json_record['resources'].append(json_record_resource)
+
+        # TODO Add parent relation if exists
+        # json_record['resources'].append( { "relation_type" : "info" } )
+
+        # json_record[schema_ref["81"]['CKAN API property']] = can_be_used_in_RAMP
+        '''
+        strtmp = str(HNAP_fileIdentifier)
+        str1 = "9b1d5058-81a9-420c-afb9-69791b06e35a"
+        str2 = "6ac8d5f2-6a3d-4313-8785-881b2ac2ad24"
+        str3 = "10987662-c496-4ba8-a6b9-21cb5a134da2"
+        str4 = "fb362c48-fe21-4e4d-abee-cf7ef92b475d"
+        str5 = "15c36c35-bb63-425e-9753-12704d310844"
+        str6 = "267e20aa-97e8-43da-8c23-1234376938bc"
+        str7 = "308b7792-a075-4b43-a68f-37bf35d76a9f"
+        str8 = "848e943b-1a98-43b8-acb3-ac89af17ea41"
+        str9 = "9a42d891-fc9c-44b3-8fba-9d9ed96890cf"
+        str10= "8ac7fcc1-779c-480c-a31a-3bfca2629cd5"
+        str11= "3f78ae16-d59f-494e-bb1f-ffbabb8eff9b"
+        str12= "981a18a3-6f0d-4109-b3d2-019589fad7c6" 
+        if [strtmp == str1] or [strtmp == str2] or [strtmp == str3] or [strtmp == str4] or\
+           [strtmp == str5] or [strtmp == str6] or [strtmp == str7] or [strtmp == str8] or \
+           [strtmp == str9] or [strtmp == str10] or [strtmp == str11] or [strtmp == str12] :
+            can_be_used_in_RAMP = True
+        '''
+        schemafile.close()
+        return HNAP_fileIdentifier, json_record, can_be_used_in_RAMP
 
-                # CC::OpenMaps-71 Character Set
-                # TBS 2016-04-13: Not in HNAP, we can skip
-                # CC::OpenMaps-74 Size
-                # TBS 2016-04-13: Not in HNAP, we can skip
+    # Records are mapped in worker processes with more than one job, the
+    # display isn't slowed down then as it would hold the workers back
+    jobs = int(arguments['-j'])
+    display_pause = 0.1 if jobs == 1 else 0
 
-                # CC::OpenMaps-74 Download URL
+    json_records = []
+    for records in mappedRecords(
+            input_documents, mapRecord, record_index, jobs):
+        # Each input block's records are mapped as they are iterated over
+        ##DEBUG START##
+        # root = etree.parse("harvested_records.xml")
+        ##DEBUG END##
 
-                value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["74"])
-                if value:
-                    json_record_resource[schema_ref["74"]['CKAN API property']] = value
-                else:
-                    reportError(
-                        HNAP_fileIdentifier, [
-                            schema_ref["74"]['CKAN API property'],
-                            'URL, mandatory field missing'
-                        ])
+###############################################
+###############################################
+        for record_fileIdentifier, record_changeDate, mapping in records:
+            if record_index is not None and isUnchanged(
+                    record_index, record_fileIdentifier, record_changeDate):
+                print "\x1b[0;37;44m Unchanged: \x1b[0m " + str(record_fileIdentifier)
+                num_unchanged += 1
+                continue
 
-                # # CC::OpenMaps-75 Title (English)
-                # # XXX Need to confirm why this is not included
-                # json_record[schema_ref["75"]['CKAN API property']] = {}
-
-                # value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["75"])
-                # if value:
-                #     json_record[schema_ref["75"]['CKAN API property']][CKAN_primary_lang] = value
-
-                # # CC::OpenMaps-76 Title (French)
-                # # XXX Need to confirm why this is not included
-                # value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["75b"])
-                # if value:
-                #     json_record[schema_ref["75"]['CKAN API property']][schema_ref["75b"]['CKAN API property'].split('.')[1]] = value
-
-                # CC::OpenMaps-76 Record Type
-                # TBS 2016-04-13: Not in HNAP, we can skip
-                # CC::OpenMaps-78 Relationship Type
-                # TBS 2016-04-13: Not in HNAP, we can skip
-                # CC::OpenMaps-79 Language
-                # TBS 2016-04-13: Not in HNAP, we can skip
-                # CC::OpenMaps-80 Record URL
-                # TBS 2016-04-13: Not in HNAP, we can skip
-
-                # CC::OpenMaps-81 Mappable
-                # Stored as a generic Display Flag in preperation for other forms of visualizations
-
-                # if schema_ref["81"]['CKAN API property'] not in json_record:
-                #    can_be_used_in_RAMP = False
-                #    json_record[schema_ref["81"]['CKAN API property']] = can_be_used_in_RAMP
-
-                # If false check if true now
-                if not can_be_used_in_RAMP:
-                    value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["81"])
-                    if value:
-                        protocol_desc = value.strip()
-                        if protocol_desc in mappable_protocols:
-                            can_be_used_in_RAMP = True
-
-                            # check to see if the URL is HTTPS
-                            value = fetch_FGP_value(resource, HNAP_fileIdentifier, schema_ref["74"])
-                            # if value[:value.find(":")] == 'http':
-                            # print "No HTTPS: " + HNAP_fileIdentifier
-                            if value:
-                                can_be_used_in_RAMP = value[:value.find(":")] == 'https'
-
-                # Append the resource to the Open Maps record
-                json_record['resources'].append(json_record_resource)
-
-            # TODO Add parent relation if exists
-            # json_record['resources'].append( { "relation_type" : "info" } )
-
-            # json_record[schema_ref["81"]['CKAN API property']] = can_be_used_in_RAMP
+            mapped = mapping()
+            if mapped is None:
+                return 0
+            if mapped is False:
+                break
+            HNAP_fileIdentifier, json_record, can_be_used_in_RAMP = mapped
             view_on_map = ""
-            '''
-            strtmp = str(HNAP_fileIdentifier)
-            str1 = "9b1d5058-81a9-420c-afb9-69791b06e35a"
-            str2 = "6ac8d5f2-6a3d-4313-8785-881b2ac2ad24"
-            str3 = "10987662-c496-4ba8-a6b9-21cb5a134da2"
-            str4 = "fb362c48-fe21-4e4d-abee-cf7ef92b475d"
-            str5 = "15c36c35-bb63-425e-9753-12704d310844"
-            str6 = "267e20aa-97e8-43da-8c23-1234376938bc"
-            str7 = "308b7792-a075-4b43-a68f-37bf35d76a9f"
-            str8 = "848e943b-1a98-43b8-acb3-ac89af17ea41"
-            str9 = "9a42d891-fc9c-44b3-8fba-9d9ed96890cf"
-            str10= "8ac7fcc1-779c-480c-a31a-3bfca2629cd5"
-            str11= "3f78ae16-d59f-494e-bb1f-ffbabb8eff9b"
-            str12= "981a18a3-6f0d-4109-b3d2-019589fad7c6" 
-            if [strtmp == str1] or [strtmp == str2] or [strtmp == str3] or [strtmp == str4] or\
-               [strtmp == str5] or [strtmp == str6] or [strtmp == str7] or [strtmp == str8] or \
-               [strtmp == str9] or [strtmp == str10] or [strtmp == str11] or [strtmp == str12] :
-                can_be_used_in_RAMP = True
-            '''
 
             if can_be_used_in_RAMP:
                 json_record['display_flags'].append('fgp_viewer')
@@ -2011,11 +2074,11 @@ def main():
             ##################################################
 
             if HNAP_fileIdentifier in error_records:
-                time.sleep(0.1)  # slow display#
+                time.sleep(display_pause)  # slow display#
                 print "\x1b[0;37;41m Reject: \x1b[0m " + str(HNAP_fileIdentifier) + view_on_map
                 num_rejects += 1
             else:
-                time.sleep(0.1)  # slow display#
+                time.sleep(display_pause)  # slow display#
                 print "\x1b[0;37;42m Accept: \x1b[0m " + str(HNAP_fileIdentifier) + view_on_map
                 json_record['imso_approval'] = 'true'
                 json_record['ready_to_publish'] = 'true'
@@ -2023,7 +2086,12 @@ def main():
                 json_record['restrictions'] = 'unrestricted'
                 # if error don't do this
                 json_records.append(json_record)
-                schemafile.close()
+                if record_changeDate:
+                    converted_records[record_fileIdentifier] = \
+                        record_changeDate
+                    if record_index is not None:
+                        record_index[record_fileIdentifier] = \
+                            record_changeDate
 
             ##################################################
             #                                                #
@@ -2071,7 +2139,8 @@ def main():
         print ""
         print "* Number of records accepted: " + str(len(json_records))
         print ""
-        print "* Number of records rejected: " + str(num_rejects)
+        print "* Number of records rejected: " + str(
+            num_rejects + len(unreadable_files))
         print ""
         print "* Number with view on map:    " + str(num_view_on_map)
         print ""
@@ -2079,6 +2148,12 @@ def main():
             len(error_output)) + " [ harvested_record_errors.csv | harvested_record_errors.html ]"
         print ""
 
+    if num_unchanged > 0:
+        print "* Number of unchanged records skipped: " + str(num_unchanged)
+        print ""
+
+    savePendingRecords(converted_records, index_file)
+
     output = codecs.open(output_err, 'w', 'utf-8')
     if len(error_output) > 0:
         output.write('"id","field","description","value"' + u"\n")
@@ -2094,6 +2169,350 @@ def main():
 
 
 
+##################################################
+# Input functions
+# readDocuments(input_file, record_parents)
+# readDirectory(directory, patterns)
+# fileRecords(file_name)
+# inputPieces(input_file)
+# inputWindows(input_file)
+# documentSpans(data, start, end)
+# documentRecords(first_piece, pieces, pending_pieces, record_parents)
+# parsedRecords(parser, record_parents)
+# checkPrefixes(record)
+# dropBlankLines(record)
+
+# Documents start where a line begins with an XML declaration
+DOCUMENT_BOUNDARY = '\n<?xml'
+# Bytes read from the input, and fed to the parser, at a time
+INPUT_CHUNK_SIZE = 1 << 20
+# A line holding only blank space, with the line break before it
+BLANK_LINE = re.compile(r'\n[ \t\r\f\v]*(?=\n)')
+# Elements and attributes whose prefix wasn't declared
+UNDECLARED_PREFIXES = etree.XPath(
+    'descendant-or-self::*[namespace-uri() = "" and contains(name(), ":")]'
+    ' | descendant-or-self::*/@*'
+    '[namespace-uri() = "" and contains(name(), ":")]')
+
+# Every XML document of the input in turn, as a generator of its records.
+# They read from the same input, what the caller leaves of a document is
+# read past before the next one is started.
+def readDocuments(input_file, record_parents):
+    pieces = inputPieces(input_file)
+    pending_pieces = []
+    for starts_document, piece in pieces:
+        pending_pieces.append(piece)
+        break
+    while pending_pieces:
+        records = documentRecords(
+            pending_pieces.pop(), pieces, pending_pieces, record_parents)
+        yield records
+        for record in records:
+            pass
+
+
+# The documents of every file in directory matching one of the glob
+# patterns, in file name order, each file holding a single record as with
+# -f.  All of them go through the one conversion so the output and the
+# error report cover the whole directory.  A file that isn't well formed
+# is rejected before any of it is converted and the next one converted.
+def readDirectory(directory, patterns):
+    file_names = set()
+    for pattern in patterns:
+        file_names.update(glob.glob(os.path.join(directory, pattern.strip())))
+    for file_name in sorted(file_names):
+        print "Processing " + file_name + " file..."
+        try:
+            records = fileRecords(file_name)
+        except etree.XMLSyntaxError as e:
+            print "\x1b[0;37;41m Reject: \x1b[0m " + file_name
+            reportError(file_name, ['', 'Unreadable XML file', str(e)])
+            unreadable_files.append(file_name)
+            continue
+        yield records
+
+
+# The gmd:MD_Metadata of a single record file, parsed whole.  Blank space
+# before the XML declaration is dropped as with -f.
+def fileRecords(file_name):
+    with open(file_name, 'rb') as fh:
+        root = etree.fromstring(fh.read().lstrip())
+    if root.tag == '{http://www.isotc211.org/2005/gmd}MD_Metadata':
+        dropBlankLines(root)
+        return [root]
+    return []
+
+
+# The input cut at the document boundaries, as (starts_document, piece),
+# pieces being at most INPUT_CHUNK_SIZE long.  Blank space before a
+# document's XML declaration is dropped as the parser refuses it.
+def inputPieces(input_file):
+    new_document = True
+    for data, end in inputWindows(input_file):
+        for offset, length, starts_document in documentSpans(data, 0, end):
+            new_document = new_document or starts_document
+            span_end = offset + length
+            for piece_offset in xrange(offset, span_end, INPUT_CHUNK_SIZE):
+                piece = data[piece_offset:
+                             min(piece_offset + INPUT_CHUNK_SIZE, span_end)]
+                if new_document:
+                    piece = piece.lstrip()
+                if piece:
+                    yield new_document, piece
+                    new_document = False
+
+
+# (data, end) windows over the input, data[:end] being split next.  A
+# mapped file is split in one window straight from the page cache, a stream
+# is read a chunk at a time with the end of each chunk kept back for the
+# next one in case it holds the start of a boundary.
+def inputWindows(input_file):
+    if isinstance(input_file, mmap.mmap):
+        yield input_file, len(input_file)
+        return
+    data = ''
+    while True:
+        chunk = input_file.read(INPUT_CHUNK_SIZE)
+        data += chunk
+        end = len(data)
+        if chunk:
+            end = max(end - len(DOCUMENT_BOUNDARY) + 1, 0)
+        yield data, end
+        if not chunk:
+            return
+        data = data[end:]
+
+
+# (offset, length, starts_document) of the parts of data[start:end] cut at
+# each boundary whose line break is in that range.  The boundaries are
+# found with find() so the data is scanned without being copied or split
+# into lines.
+def documentSpans(data, start, end):
+    stop = end + len(DOCUMENT_BOUNDARY) - 1
+    offset = start
+    starts_document = False
+    boundary = data.find(DOCUMENT_BOUNDARY, start, stop)
+    while boundary != -1:
+        yield offset, boundary + 1 - offset, starts_document
+        offset = boundary + 1
+        starts_document = True
+        boundary = data.find(DOCUMENT_BOUNDARY, offset, stop)
+    yield offset, end - offset, starts_document
+
+
+# Pull-parse one document piece by piece from first_piece on and yield each
+# gmd:MD_Metadata directly under one of record_parents once it is complete.
+# A record is cleared, with the records before it, once the caller moves
+# on, so memory holds one record whatever the size of the input.  The piece
+# starting the next document is left in pending_pieces.
+def documentRecords(first_piece, pieces, pending_pieces, record_parents):
+    parser = etree.XMLPullParser(
+        events=('end',), tag='{http://www.isotc211.org/2005/gmd}MD_Metadata')
+    parser.feed(first_piece)
+    for record in parsedRecords(parser, record_parents):
+        yield record
+    for starts_document, piece in pieces:
+        if starts_document:
+            pending_pieces.append(piece)
+            break
+        parser.feed(piece)
+        for record in parsedRecords(parser, record_parents):
+            yield record
+    parser.close()
+    for record in parsedRecords(parser, record_parents):
+        yield record
+
+
+# Records completed by what the parser was fed so far
+def parsedRecords(parser, record_parents):
+    for event, record in parser.read_events():
+        parent = record.getparent()
+        if (parent.tag if parent is not None else None) in record_parents:
+            checkPrefixes(record)
+            dropBlankLines(record)
+            yield record
+        # Nested records are part of their enclosing record
+        if parent is None or parent.tag in record_parents:
+            record.clear()
+            while record.getprevious() is not None:
+                del parent[0]
+
+
+# lxml only refuses a prefix that wasn't declared once the whole document
+# is parsed, a record using one is refused before it is converted
+def checkPrefixes(record):
+    for undeclared in UNDECLARED_PREFIXES(record):
+        if undeclared.is_attribute:
+            element = undeclared.getparent()
+            prefix, name = undeclared.attrname.split(':', 1)
+            message = 'Namespace prefix %s for %s on %s is not defined' % (
+                prefix, name, etree.QName(element).localname)
+        else:
+            element = undeclared
+            prefix, name = element.tag.split(':', 1)
+            message = 'Namespace prefix %s on %s is not defined' % (
+                prefix, name)
+        raise etree.XMLSyntaxError(
+            '%s, line %d' % (message, element.sourceline), None,
+            element.sourceline, 0)
+
+
+# Lines holding only blank space were left out when the input was read
+# line by line, they are taken out of the record's text so the values
+# converted stay the same
+def dropBlankLines(record):
+    for node in record.iter():
+        if node.text and node.text.count('\n') > 1:
+            node.text = BLANK_LINE.sub('', node.text)
+        if node.tail and node.tail.count('\n') > 1:
+            node.tail = BLANK_LINE.sub('', node.tail)
+
+
+##################################################
+# Record mapping functions
+# mappedRecords(input_documents, map_record, record_index, jobs)
+# serialRecords(input_documents, map_record)
+# parallelRecords(input_documents, map_record, record_index, jobs)
+# queuedMapping(record_xml, result)
+# mapQueuedRecord(record_xml)
+# separately(function, *args)
+# takeIn(report)
+# RecordOutput()
+
+# Records mapped ahead in the worker processes for each job
+PENDING_RECORDS_PER_JOB = 8
+# The map_record of main() for the worker processes, which inherit it
+record_mapper = None
+
+# Every input block in turn as the (fileIdentifier, changeDate, mapping)
+# of its records in input order, mapping() returning what map_record
+# returns for the record.  Only the records the caller maps are mapped with
+# one job, with more they are mapped ahead in that many worker processes.
+# The caller can leave a block for the next one at any record.
+def mappedRecords(input_documents, map_record, record_index, jobs):
+    if jobs > 1:
+        mappings = parallelRecords(
+            input_documents, map_record, record_index, jobs)
+    else:
+        mappings = serialRecords(input_documents, map_record)
+    for document, records in itertools.groupby(
+            mappings, operator.itemgetter(0)):
+        yield (mapping[1:] for mapping in records)
+
+
+# (input block, fileIdentifier, changeDate, mapping) of the records, mapped
+# in turn by the caller
+def serialRecords(input_documents, map_record):
+    for document, records in enumerate(input_documents):
+        for record in records:
+            record_fileIdentifier, record_changeDate = recordChangeDate(record)
+            yield (document, record_fileIdentifier, record_changeDate,
+                   functools.partial(map_record, record))
+
+
+# As serialRecords(), the records being sent to a pool of worker processes
+# as they are read, at most PENDING_RECORDS_PER_JOB for each job ahead of
+# the caller.  The results are taken in input order so the updates keep
+# the order they were supplied in.  The errors reported and the output
+# printed while mapping or reading a record only count when its turn
+# comes, as does an input block that can't be read.  Records unchanged in
+# the index aren't sent.
+def parallelRecords(input_documents, map_record, record_index, jobs):
+    global record_mapper
+    record_mapper = map_record
+    readings = ((document, record)
+                for document, records in enumerate(input_documents)
+                for record in records)
+    pool = multiprocessing.Pool(jobs)
+    read_error = None
+    try:
+        pending_records = collections.deque()
+        while True:
+            try:
+                reading, read_report = separately(next, readings, None)
+            except etree.XMLSyntaxError:
+                read_error = sys.exc_info()
+                break
+            if reading is None:
+                break
+            document, record = reading
+            record_fileIdentifier, record_changeDate = recordChangeDate(record)
+            record_xml = etree.tostring(record)
+            result = None
+            if record_index is None or not isUnchanged(
+                    record_index, record_fileIdentifier, record_changeDate):
+                result = pool.apply_async(mapQueuedRecord, (record_xml,))
+            pending_records.append((read_report, (
+                document, record_fileIdentifier, record_changeDate,
+                functools.partial(queuedMapping, record_xml, result))))
+            if len(pending_records) >= jobs * PENDING_RECORDS_PER_JOB:
+                report, pending_record = pending_records.popleft()
+                takeIn(report)
+                yield pending_record
+        pool.close()
+        while pending_records:
+            report, pending_record = pending_records.popleft()
+            takeIn(report)
+            yield pending_record
+        if read_error:
+            raise read_error[0], read_error[1], read_error[2]
+        takeIn(read_report)
+    finally:
+        pool.terminate()
+
+
+# What a worker mapped, taking in its report.  A record that wasn't sent,
+# being unchanged when it was read, is mapped here should an earlier record
+# of the same fileIdentifier have changed the index since.
+def queuedMapping(record_xml, result):
+    if result is None:
+        return record_mapper(etree.fromstring(record_xml))
+    mapped, report = result.get()
+    takeIn(report)
+    return mapped
+
+
+# Map a record in a worker process
+def mapQueuedRecord(record_xml):
+    return separately(record_mapper, etree.fromstring(record_xml))
+
+
+# Call function(*args) keeping the errors it reports and the output it
+# prints apart, as (result, report)
+def separately(function, *args):
+    global error_output
+    global error_records
+    kept = error_output, error_records, sys.stdout
+    error_output, error_records, sys.stdout = [], {}, RecordOutput()
+    try:
+        return function(*args), (
+            error_output, error_records, sys.stdout.pieces)
+    finally:
+        error_output, error_records, sys.stdout = kept
+
+
+# Report the errors and print the output kept apart by separately()
+def takeIn(report):
+    record_error_output, record_error_records, pieces = report
+    error_output.extend(record_error_output)
+    for HNAP_fileIdentifier, errors in record_error_records.items():
+        error_records.setdefault(HNAP_fileIdentifier, []).extend(errors)
+    for piece in pieces:
+        if isinstance(piece, unicode):
+            piece = piece.encode(
+                sys.stdout.encoding or sys.getdefaultencoding())
+        sys.stdout.write(piece)
+
+
+# Stands in for stdout in separately()
+class RecordOutput(object):
+    def __init__(self):
+        self.pieces = []
+
+    def write(self, piece):
+        self.pieces.append(piece)
+
+
 ##################################################
 # Reporting, Sanity and Access functions
 # reportError(HNAP_fileIdentifier, errorInfo)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Usage: record_index.py -e environment
+
+Move the records of the last conversion into the record index of the
+environment once they are loaded into its CKAN
+
+Options:
+    -e environment  STAGING/PRODUCTION, the CKAN the records were loaded into
+"""
+
+# Local index of the last changeDate uploaded for each fileIdentifier, one
+# per CKAN environment
+#
+# harvest_hnap.py drops records from the harvested pages when their
+# changeDate is already in the index, hnap2cc-json.py skips them before
+# mapping and lists the changeDate of every record it accepts in the
+# pending file next to the index.  Only once they are uploaded does
+# startharvest.sh run this script to move them into the index, a record
+# converted but never uploaded is harvested again.
+# Delete the index file to force every record through again.
+
+import json
+import os
+
+RECORD_NAMESPACES = {
+    'gmd': 'http://www.isotc211.org/2005/gmd',
+    'gco': 'http://www.isotc211.org/2005/gco'}
+
+
+def recordIndexFile(environment):
+# The index of the staging or production CKAN, after the JsonOutput-stag
+# and JsonOutput-prod directories
+    if 'PROD' in environment.upper():
+        return 'record_index-prod.json'
+    return 'record_index-stag.json'
+
+
+def pendingRecordsFile(index_file):
+# Records converted for the index's environment but not uploaded yet
+    return os.path.splitext(index_file)[0] + '.pending.json'
+
+
+def loadRecordIndex(index_file):
+# fileIdentifier -> changeDate, empty if nothing was uploaded yet
+    if not os.path.isfile(index_file):
+        return {}
+    with open(index_file, 'rb') as fh:
+        return json.load(fh)
+
+
+def saveRecordIndex(record_index, index_file):
+# Written to the side and renamed so an interrupted save keeps the old index
+    temporary_file = index_file + '.tmp'
+    with open(temporary_file, 'wb') as fh:
+        json.dump(record_index, fh, indent=0, sort_keys=True)
+    os.rename(temporary_file, index_file)
+
+
+def savePendingRecords(converted_records, index_file):
+# The records of the last conversion, replacing those of an earlier one
+# that was never uploaded as its output is replaced too
+    saveRecordIndex(converted_records, pendingRecordsFile(index_file))
+
+
+def commitPendingRecords(index_file):
+# Move the pending records into the index, returns how many
+    pending_file = pendingRecordsFile(index_file)
+    if not os.path.isfile(pending_file):
+        return 0
+    pending_records = loadRecordIndex(pending_file)
+    record_index = loadRecordIndex(index_file)
+    record_index.update(pending_records)
+    saveRecordIndex(record_index, index_file)
+    os.remove(pending_file)
+    return len(pending_records)
+
+
+def recordChangeDate(record):
+# (fileIdentifier, changeDate) of a gmd:MD_Metadata element, the changeDate
+# is the gmd:dateStamp GeoNetwork sorts and filters on.  None when missing.
+    file_identifier = record.xpath(
+        'gmd:fileIdentifier/gco:CharacterString/text()',
+        namespaces=RECORD_NAMESPACES)
+    change_date = record.xpath(
+        'gmd:dateStamp/gco:DateTime/text() | gmd:dateStamp/gco:Date/text()',
+        namespaces=RECORD_NAMESPACES)
+    return (file_identifier[0].strip() if file_identifier else None,
+            change_date[0].strip() if change_date else None)
+
+
+def isUnchanged(record_index, file_identifier, change_date):
+# Already uploaded at this very changeDate
+    if not file_identifier or not change_date:
+        return False
+    return record_index.get(file_identifier) == change_date
+
+
+if __name__ == '__main__':
+    import docopt
+
+    arguments = docopt.docopt(__doc__)
+    index_file = recordIndexFile(arguments['-e'])
+    print "Recorded %d uploaded records in %s" % (
+        commitPendingRecords(index_file), index_file)
@@ -1,6 +1,6 @@
 #!/bin/bash
 # -*- coding: utf-8 -*-
-"""Usage: hharvest [-e environment STAGING/PRODUCTION] [-d xml-file-directory] [-b skip send request to csw ] [-p skip push to Open-Canada ] [-f start date time ] [-t end date time ]
+"""Usage: hharvest [-e environment STAGING/PRODUCTION] [-d xml-file-directory] [-b skip send request to csw ] [-p skip push to Open-Canada ] [-f start date time ] [-t end date time ] [-r resume an interrupted harvest ] [-i refetch the records listed in a file ] [-W watch for changes every N seconds ]
 
 Options:
     -e environment to run the script
@@ -9,6 +9,9 @@ Options:
     -p to skip pushing to OpenCanada through CKAN
     -f from date as starting date 
     -t to date as ending date of the time range
+    -r resume the harvest from its last checkpoint, appending to harvested_records.xml
+    -i fetch and convert only the fileIdentifiers listed in this file (one per line, or harvested_record_errors.csv)
+    -W keep running, probing the CSW every N seconds and harvesting, converting and uploading only when records changed since run.last
 """
 
 DIRECTORY=$(cd `dirname $0` && pwd)
@@ -26,10 +29,13 @@ unset ReqBypass
 unset OGSHARVESTRUNSTART
 unset OGSHARVESTRUNEND
 unset ProvTerr
+unset ResumeHarvest
+unset RefetchList
+unset WatchInterval
 
 CkanPush=true
 
-while getopts e:d:b:p:f:t:x: flag
+while getopts e:d:b:p:f:t:x:ri:W: flag
 do
     case "${flag}" in
         e) ProductEnv=${OPTARG^^};;
@@ -39,6 +45,9 @@ do
         f) OGSHARVESTRUNSTART=${OPTARG^^};;
         t) OGSHARVESTRUNEND=${OPTARG^^};;
         x) ProvTerr=${OPTARG^^};;
+        r) ResumeHarvest=true;;
+        i) RefetchList=${OPTARG};;
+        W) WatchInterval=${OPTARG};;
     esac
 done
 
@@ -158,18 +167,31 @@ function RetreiveMetadataXML(){
 # AND THEN the virtual environment
 # . /var/www/html/venv/staging-portal/bin/activate
     echo $ReqBypass
-    if [ -z "$ReqBypass" ]; then
+    if [ -n "$RefetchList" ]; then
+        # Fetch only the listed records by identifier, e.g. the rejected
+        # records once fixed, straight into the converter.  The list is
+        # copied first as the converter rewrites harvested_record_errors.csv
+        cp "$RefetchList" refetch_identifiers.csv
+        > harvested_records.jl
+        ./harvest_hnap.py -e $ProductEnv -i refetch_identifiers.csv | ./hnap2cc-json.py -o $ProductEnv
+    elif [ -z "$ReqBypass" ]; then
         if [ -z "$Dirfiles" ]; then
             # Collect the latest data
             # /home/odatsrv/_harvester_OpenMaps/harvest_hnap.py -f $OGS_HARVEST_LAST_RUN > harvested_records.xml
             ####send request#### 
             # 
-            > harvested_records.xml
+            # A resumed harvest appends the remaining pages to the earlier output
+            if [ -z "$ResumeHarvest" ]; then
+                > harvested_records.xml
+                HarvestResume=""
+            else
+                HarvestResume="--resume"
+            fi
             > harvested_records.jl
             if [ -z "$ProvTerr" ]; then
-                ./harvest_hnap.py -f $OGSHARVESTRUNSTART -t $OGSHARVESTRUNEND -e $ProductEnv > harvested_records.xml & pid=$!
+                ./harvest_hnap.py -f $OGSHARVESTRUNSTART -t $OGSHARVESTRUNEND -e $ProductEnv $HarvestResume >> harvested_records.xml & pid=$!
             else
-                ./harvest_hnap.py -f $OGSHARVESTRUNSTART -t $OGSHARVESTRUNEND -e $ProductEnv -p $ProvTerr > harvested_records.xml & pid=$!
+                ./harvest_hnap.py -f $OGSHARVESTRUNSTART -t $OGSHARVESTRUNEND -e $ProductEnv -p $ProvTerr $HarvestResume >> harvested_records.xml & pid=$!
             fi
             # Show progress as this can take several minutes
             spin='-\|/'
@@ -186,18 +208,10 @@ function RetreiveMetadataXML(){
             /bin/cat harvested_records.xml | ./hnap2cc-json.py -o $ProductEnv
         else
             echo "Processing single Xml files from ${Dirfiles} directory"
-            FILES=$Dirfiles/*xml
-            firstpass=true   
-            for f in $FILES
-            do
-                if [ "$firstpass" = "true" ]; then
-                    firstpass=false
-                    > "harvested_records.jl"
-                fi
-                echo "Processing $f file..."
-                # take action on each file. $f store current file name
-                ./hnap2cc-json.py -f $f -o $ProductEnv
-            done
+            # All the files go through one converter run, giving a single
+            # harvested_records.jl and error report for the directory
+            > "harvested_records.jl"
+            ./hnap2cc-json.py -d $Dirfiles -o $ProductEnv
         fi
     else
         # Create the common core JSON file
@@ -263,6 +277,10 @@ function UploadToOpenCanada(){
                     # ckanapi load datasets -I harvested_records.jl -r https://open.canada.ca/data -a $CKAN_API_KEY_PROD #&& date +"%Y-%m-%dT%H:%M:%SZ" > run.last
                 fi
             fi
+            # Only now that every file is loaded (a failed load stops the
+            # run) are the converted records marked as uploaded, a run that
+            # doesn't upload them harvests them again
+            ./record_index.py -e $ProductEnv
         else 
             for filez in $JsonOutPutDir
             do
@@ -278,7 +296,35 @@ function UploadToOpenCanada(){
 }
 
 
+function WatchForChanges(){
+    # Cheap hits request every $WatchInterval seconds for records changed
+    # after the harvest start, returns once there are some
+    if [ -z "$ProvTerr" ]; then
+        ./harvest_hnap.py -f $OGSHARVESTRUNSTART -e $ProductEnv --watch $WatchInterval
+    else
+        ./harvest_hnap.py -f $OGSHARVESTRUNSTART -e $ProductEnv -p $ProvTerr --watch $WatchInterval
+    fi
+}
+
+
 InitializeInput
-#UploadToOpenCanada
-RetreiveMetadataXML
-UploadToOpenCanada
\ No newline at end of file
+if [ -z "$WatchInterval" ]; then
+    #UploadToOpenCanada
+    RetreiveMetadataXML
+    UploadToOpenCanada
+else
+    # Long running instead of cron: the full harvest, conversion and
+    # upload only run once the probe sees changed records.  Each cycle
+    # harvests up to now and the next one watches from there.
+    while true; do
+        WatchForChanges
+        RunEnd=$(date +"%Y-%m-%dT%H:%M:%S")
+        OGSHARVESTRUNEND=$(date -u -d @$(date -d $RunEnd +%s) +"%Y-%m-%dT%H:%M:%S")
+        RetreiveMetadataXML
+        UploadToOpenCanada
+        echo $RunEnd > run.last
+        unset OGSHARVESTRUNSTART
+        unset OGSHARVESTRUNEND
+        InitializeInput
+    done
+fi
@@ -0,0 +1,241 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+"""Conversions run end to end, hnap2cc-json.py being run in a scratch
+directory on records taken from sample_data/."""
+
+import copy
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from lxml import etree
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONVERTER = os.path.join(PACKAGE_DIR, 'hnap2cc-json.py')
+RECORD_INDEX = os.path.join(PACKAGE_DIR, 'record_index.py')
+# A GetRecords response of five records, four of them accepted
+SAMPLE_HARVEST = os.path.join(
+    PACKAGE_DIR, 'sample_data', 'HNAP_harvest_20160408_160-106-65-241.xml')
+# A single record file using the xsi prefix without declaring it
+UNREADABLE_RECORD = os.path.join(PACKAGE_DIR, 'harves_record_noviewonmap.xml')
+
+NAMESPACES = {
+    'csw': 'http://www.opengis.net/cat/csw/2.0.2',
+    'gmd': 'http://www.isotc211.org/2005/gmd',
+    'gco': 'http://www.isotc211.org/2005/gco'
+}
+
+
+def sampleRecords():
+# The records of the sample harvest, in order, as (fileIdentifier, XML)
+    root = etree.parse(SAMPLE_HARVEST).getroot()
+    return [
+        (record.findtext('gmd:fileIdentifier/gco:CharacterString',
+                         namespaces=NAMESPACES),
+         etree.tostring(record, xml_declaration=True, encoding='utf-8'))
+        for record in root.iterfind(
+            'csw:SearchResults/gmd:MD_Metadata', namespaces=NAMESPACES)]
+
+
+def harvestPage(keep, edit=None):
+# The sample harvest as a page holding the records at the positions in
+# keep, passed to edit first
+    root = copy.deepcopy(etree.parse(SAMPLE_HARVEST).getroot())
+    results = root.find('csw:SearchResults', namespaces=NAMESPACES)
+    records = results.findall('gmd:MD_Metadata', namespaces=NAMESPACES)
+    for position, record in enumerate(records):
+        if position not in keep:
+            results.remove(record)
+        elif edit:
+            edit(record)
+    return etree.tostring(root, xml_declaration=True, encoding='utf-8')
+
+
+def addLanguage(record):
+# A second primary language, so it is neither English nor French
+    language = record.find('gmd:language', namespaces=NAMESPACES)
+    other_language = copy.deepcopy(language)
+    other_language[0].text = 'spa; ESP'
+    language.addnext(other_language)
+
+
+def setAbstract(text):
+# An edit setting the abstract to text
+    def edit(record):
+        record.find(
+            'gmd:identificationInfo/gmd:MD_DataIdentification/gmd:abstract/'
+            'gco:CharacterString', namespaces=NAMESPACES).text = text
+    return edit
+
+
+def setDateStamp(text):
+# An edit setting the changeDate to text
+    def edit(record):
+        record.find('gmd:dateStamp/gco:DateTime',
+                    namespaces=NAMESPACES).text = text
+    return edit
+
+
+class ConverterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.symlink(os.path.join(PACKAGE_DIR, 'config'),
+                   os.path.join(self.directory, 'config'))
+        os.mkdir(os.path.join(self.directory, 'JsonOutput-stag'))
+        os.mkdir(os.path.join(self.directory, 'JsonOutput-prod'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def convert(self, arguments, stdin=None, returncode=0, environment='stag'):
+    # Run the converter, returning what it printed
+        process = subprocess.Popen(
+            [sys.executable, CONVERTER, '-o', environment] + arguments,
+            cwd=self.directory,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT)
+        output = process.communicate(stdin or '')[0]
+        if returncode is not None:
+            self.assertEqual(process.returncode, returncode, output)
+        return output
+
+    def convertedRecords(self):
+        with open(os.path.join(
+                self.directory, 'harvested_records.jl'), 'rb') as fh:
+            return [json.loads(line) for line in fh]
+
+    def convertedIdentifiers(self):
+    # fileIdentifiers of the records written to harvested_records.jl
+        return [record['id'] for record in self.convertedRecords()]
+
+    def errorReport(self):
+        with open(os.path.join(
+                self.directory, 'harvested_record_errors.csv'), 'rb') as fh:
+            return fh.read()
+
+
+class StreamTest(ConverterTestCase):
+
+    def test_record_with_two_languages_skips_only_its_page(self):
+        records = sampleRecords()
+        harvest = '\n'.join([
+            harvestPage([0, 1], addLanguage),
+            harvestPage([2, 3])])
+        for jobs in ['1', '2']:
+            self.convert(['-j', jobs, '--ignore-index'], harvest)
+            # The rest of the page is left, as it always was, the next page
+            # is still converted
+            self.assertEqual(
+                self.convertedIdentifiers(),
+                [records[2][0], records[3][0]])
+
+    def test_blank_lines_are_left_out_of_values(self):
+        converted_notes = []
+        for abstract in ['First line.\n  \n\t\n\nSecond line.\n\n',
+                         'First line.\nSecond line.\n']:
+            self.convert(
+                ['--ignore-index'], harvestPage([0], setAbstract(abstract)))
+            converted_notes.append(
+                self.convertedRecords()[0]['notes_translated'])
+        self.assertIn('Second line.', converted_notes[0]['en'])
+        self.assertEqual(converted_notes[0], converted_notes[1])
+
+    def test_unreadable_page_is_refused_before_conversion(self):
+        records = sampleRecords()
+        # The first record of the page uses a prefix it doesn't declare
+        unreadable_page = harvestPage([2, 3]).replace(
+            '<gmd:MD_Metadata ', '<gmd:MD_Metadata undeclared:note="" ', 1)
+        harvest = '\n'.join([harvestPage([0, 1]), unreadable_page])
+        for jobs in ['1', '2']:
+            output = self.convert(
+                ['-j', jobs, '--ignore-index'], harvest, None)
+            self.assertIn('XMLSyntaxError', output)
+            self.assertIn('Accept: \x1b[0m ' + records[1][0], output)
+            self.assertNotIn(records[2][0], output)
+            self.assertNotIn(records[3][0], output)
+
+
+class RecordIndexTest(ConverterTestCase):
+
+    def recordUpload(self, environment):
+    # What startharvest.sh runs once the load into CKAN succeeded
+        subprocess.check_call(
+            [sys.executable, RECORD_INDEX, '-e', environment],
+            cwd=self.directory, stdout=open(os.devnull, 'wb'))
+
+    def test_records_not_uploaded_are_converted_again(self):
+        records = sampleRecords()
+        harvest = harvestPage([0, 1])
+        self.convert([], harvest)
+        self.assertFalse(os.path.exists(
+            os.path.join(self.directory, 'record_index-stag.json')))
+        # Upload skipped (-p false) or failed: nothing is recorded as
+        # uploaded, the next run converts the records again
+        self.convert([], harvest)
+        self.assertEqual(self.convertedIdentifiers(),
+                         [records[0][0], records[1][0]])
+
+        self.recordUpload('STAGING')
+        self.assertFalse(os.path.exists(
+            os.path.join(self.directory, 'record_index-stag.pending.json')))
+        os.remove(os.path.join(self.directory, 'harvested_records.jl'))
+        output = self.convert([], harvest)
+        self.assertFalse(os.path.exists(
+            os.path.join(self.directory, 'harvested_records.jl')))
+        self.assertIn('* Number of unchanged records skipped: 2', output)
+
+        # Production has its own index
+        self.convert([], harvest, environment='prod')
+        self.assertEqual(self.convertedIdentifiers(),
+                         [records[0][0], records[1][0]])
+
+    def test_changed_record_is_converted_again(self):
+        records = sampleRecords()
+        self.convert([], harvestPage([0, 1]))
+        self.recordUpload('STAGING')
+        self.convert(
+            [], harvestPage([0, 1], setDateStamp('2030-01-01T00:00:00')))
+        self.assertEqual(self.convertedIdentifiers(),
+                         [records[0][0], records[1][0]])
+
+
+class DirectoryTest(ConverterTestCase):
+
+    def test_unreadable_file_is_rejected_whole(self):
+        records = sampleRecords()
+        record_directory = os.path.join(self.directory, 'records')
+        os.mkdir(record_directory)
+        for sequence, (identifier, record_xml) in enumerate(records):
+            with open(os.path.join(
+                    record_directory, '%02d.xml' % sequence), 'wb') as fh:
+                fh.write(record_xml)
+        shutil.copy(UNREADABLE_RECORD,
+                    os.path.join(record_directory, '01b.xml'))
+
+        output = self.convert(['-d', record_directory])
+
+        unreadable_identifier = etree.parse(
+            UNREADABLE_RECORD, etree.XMLParser(recover=True)).findtext(
+                'gmd:fileIdentifier/gco:CharacterString',
+                namespaces=NAMESPACES)
+        converted = self.convertedIdentifiers()
+        self.assertNotIn(unreadable_identifier, converted)
+        self.assertNotIn('Accept: \x1b[0m ' + unreadable_identifier, output)
+        self.assertIn('Reject: \x1b[0m ' + os.path.join(
+            record_directory, '01b.xml'), output)
+        self.assertIn('Unreadable XML file', self.errorReport())
+        self.assertIn('* Number of records rejected: 2', output)
+        # The files after it are still converted, the last sample record
+        # being rejected
+        self.assertEqual(
+            converted, [identifier for identifier, record_xml in records[:4]])
+
+
+if __name__ == '__main__':
+    unittest.main()